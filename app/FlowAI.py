@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 from utils.logging import setup_logging, get_logger
 from services.llm_factory import get_llm_client
+from services.adapters.resilience import BackendUnavailableError, get_breaker_states
 from storage.prompts_repo import PromptsRepository
 from utils.config import get_config
 from utils.translator import translator
@@ -76,13 +77,14 @@ def send_message():
 
     try:
         from components.chat_ui import ChatUI
-        from services.mcp_client import MCPHTTPClient
+        from services.mcp_client import get_mcp_client
 
         chat_ui = ChatUI()
-        mcp_client = MCPHTTPClient()
+        mcp_client = get_mcp_client()
 
         # Prepare messages with prompt if selected
         messages_to_send = st.session_state.messages.copy()
+        prompt_data = None
         if st.session_state.current_prompt:
             prompt_data = prompts_repo.get_prompt(st.session_state.current_prompt)
             if prompt_data:
@@ -106,9 +108,17 @@ def send_message():
 
         print(f"DEBUG: Sending message: {user_input[:50]}...")
         # Send message with tool orchestration
-        st.session_state.messages = chat_ui.send_message(messages_to_send, user_input, tools)
+        st.session_state.messages = chat_ui.send_message(messages_to_send, user_input, tools, prompt_data)
         print("DEBUG: Message sent successfully")
 
+    except BackendUnavailableError as e:
+        # Circuit breaker is open: fail fast instead of waiting on a dead backend
+        logger.warning(f"LLM backend unavailable: {e}")
+        error_message = {
+            "role": "assistant",
+            "content": translator.get('errors.backend_unavailable').format(retry_in=int(e.retry_in))
+        }
+        st.session_state.messages.append(error_message)
     except Exception as e:
         logger.error(f"Error sending message: {e}")
         error_message = {
@@ -170,6 +180,18 @@ with st.sidebar:
         translator.set_language(selected_language)
         st.rerun()
 
+    # LLM backend circuit breaker status
+    breaker_states = get_breaker_states()
+    if breaker_states:
+        st.markdown(f"### {translator.get('backend_status_title')}")
+        for endpoint, state in breaker_states.items():
+            icon = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}.get(state["state"], "⚪")
+            label = translator.get(f"backend_states.{state['state']}", state["state"])
+            if state["state"] == "open":
+                st.caption(f"{icon} {endpoint}: {label} ({int(state['retry_in'])}s)")
+            else:
+                st.caption(f"{icon} {endpoint}: {label}")
+
 st.title(f"🤖 {translator.get('app_title')}")
 st.markdown(translator.get("app_subtitle"))
 
@@ -212,10 +234,10 @@ chat_container = st.container()
 with chat_container:
     try:
         from components.chat_ui import ChatUI
-        from services.mcp_client import MCPHTTPClient
+        from services.mcp_client import get_mcp_client
 
         chat_ui = ChatUI()
-        mcp_client = MCPHTTPClient()
+        mcp_client = get_mcp_client()
         tools = mcp_client.list_tools()
 
         # Filter out system messages for display
@@ -251,7 +273,8 @@ if prompt := st.chat_input(translator.get("status_messages.sending"), key="home_
         "content": prompt
     }
     st.session_state.messages.append(user_message)
-    send_message()
+    with chat_container:
+        send_message()
     st.rerun()
 
 # Action buttons
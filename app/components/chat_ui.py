@@ -2,7 +2,7 @@ import streamlit as st
 import json
 from typing import List, Dict, Any, Optional
 from services.orchestrator import ChatOrchestrator
-from services.mcp_client import MCPHTTPClient
+from services.mcp_client import get_mcp_client
 from utils.translator import translator
 
 class ChatUI:
@@ -10,7 +10,7 @@ class ChatUI:
 
     def __init__(self):
         self.orchestrator = ChatOrchestrator()
-        self.mcp_client = MCPHTTPClient()
+        self.mcp_client = get_mcp_client()
 
     def render_chat(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None):
         """Render the chat interface with tool support."""
@@ -100,7 +100,8 @@ class ChatUI:
             st.json(result)
 
     def send_message(self, messages: List[Dict[str, Any]], user_input: str,
-                    tools: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+                    tools: Optional[List[Dict[str, Any]]] = None,
+                    preset: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Send user message and get AI response with tool orchestration."""
         # Add user message
         messages.append({
@@ -108,28 +109,95 @@ class ChatUI:
             "content": user_input
         })
 
-        # Get AI response with tool orchestration
-        with st.spinner(translator.get("status_messages.waiting_response")):
-            response = self.orchestrator.chat_with_tools(messages, tools)
+        with st.chat_message("user"):
+            st.markdown(user_input)
+
+        # Render orchestration events as they arrive: tool progress in a status box, the answer as it streams
+        final = {"content": "", "tool_results": []}
+        with st.chat_message("assistant"):
+            status_slot = st.container()
+            answer = st.empty()
+            answer.caption(translator.get("status_messages.waiting_response"))
+            status = None
+            text = ""
+
+            for event in self.orchestrator.iter_chat_events(messages, tools, preset,
+                                                             language=st.session_state.get("language")):
+                if event["type"] == "token":
+                    text += event["text"]
+                    answer.markdown(text + "▌")
+                elif event["type"] == "tool_call_detected":
+                    if status is None:
+                        status = status_slot.status(translator.get("chat_events.tool_detected"), expanded=True)
+                    if event["tool_call"] is None:
+                        status.update(label=self._tool_label(event["name"]))
+                    # Text before a tool call is preamble, not the answer
+                    text = ""
+                    answer.empty()
+                elif event["type"] == "tool_started":
+                    label = self._tool_label(event["tool_call"]["function"]["name"],
+                                             event["tool_call"]["function"]["arguments"])
+                    status.update(label=label)
+                    status.write(f"⏳ {label}")
+                elif event["type"] == "tool_progress":
+                    status.update(label=self._progress_label(event))
+                elif event["type"] == "tool_finished":
+                    icon = "✅" if event["result"]["success"] else "⚠️"
+                    status.write(f"{icon} " + translator.get("chat_events.tool_finished").format(
+                        tool=event["tool_call"]["function"]["name"], seconds=event["elapsed"]))
+                elif event["type"] == "completion_started" and event["escalated"]:
+                    if status is not None:
+                        status.update(label=translator.get("chat_events.escalating").format(model=event["model"]))
+                    text = ""
+                    answer.caption(translator.get("chat_events.escalating").format(model=event["model"]))
+                elif event["type"] == "completion_started" and event["phase"] == "answer":
+                    if status is not None:
+                        status.update(label=translator.get("chat_events.writing"))
+                    answer.caption(translator.get("chat_events.writing"))
+                elif event["type"] == "final":
+                    final = event
+
+            answer.markdown(final["content"])
+            if status is not None:
+                failed = any(not result["success"] for result in final["tool_results"])
+                status.update(label=translator.get("chat_events.tools_done").format(count=len(final["tool_results"])),
+                              state="error" if failed else "complete", expanded=False)
 
-        # Add assistant response
-        assistant_message = {
+        messages.append({
             "role": "assistant",
-            "content": response["content"]
-        }
-
-        # Include tool calls if present
-        if "tool_calls" in response:
-            assistant_message["tool_calls"] = response["tool_calls"]
-
-        messages.append(assistant_message)
+            "content": final["content"]
+        })
 
         # Add tool results if any
-        for tool_result in response.get("tool_results", []):
+        for tool_result in final["tool_results"]:
             messages.append({
                 "role": "tool",
                 "tool_call_id": tool_result["tool_call_id"],
                 "content": tool_result["content"]
             })
 
-        return messages
\ No newline at end of file
+        return messages
+
+    def _progress_label(self, event: Dict[str, Any]) -> str:
+        """Describe a tool's reported progress, e.g. "send_expedite_email: 3 of 10 - Sent to ACME"."""
+        tool = event["tool_call"]["function"]["name"]
+        if event["progress"] is None:
+            label = self._tool_label(tool, event["tool_call"]["function"]["arguments"])
+        elif event["total"]:
+            label = translator.get("chat_events.tool_progress").format(
+                tool=tool, progress=event["progress"], total=event["total"])
+        else:
+            label = translator.get("chat_events.tool_progress_count").format(tool=tool, progress=event["progress"])
+        if event["message"]:
+            label += f" - {event['message']}"
+        return label
+
+    def _tool_label(self, tool_name: str, arguments: Optional[str] = None) -> str:
+        """Describe a running tool, e.g. "Checking order PO-123..."."""
+        template = translator.get(f"chat_events.tools.{tool_name}", "")
+        if template and arguments:
+            try:
+                return template.format(**json.loads(arguments))
+            except (json.JSONDecodeError, TypeError, KeyError, IndexError, ValueError):
+                pass
+        return translator.get("chat_events.tool_running").format(tool=tool_name)
@@ -1,10 +1,67 @@
+import os
+
 # Basic configuration for MCP orchestration
 LLM_API_FLAVOR = "lmstudio"
 LLM_BASE_URL = "http"
 LLM_PORT = 1234
 LLM_DEFAULT_MODEL = "local-model"
+LLM_POOL_SIZE = 10  # Keep-alive connections per LLM endpoint
+LLM_CONNECT_TIMEOUT = 5  # Seconds to establish a connection before giving up
+LLM_PROBE_TIMEOUT = 30  # Seconds allowed for each capability probe request
+LLM_PROBE_FAILURE_TTL = 60  # Seconds a failed capability probe is not retried
+
+# Retry and circuit breaker for LLM backends
+LLM_RETRY_ATTEMPTS = int(os.getenv('LLM_RETRY_ATTEMPTS', '3'))
+LLM_RETRY_BASE_DELAY = 0.25  # Seconds, doubled per attempt with full jitter
+LLM_RETRY_MAX_DELAY = 4.0
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv('LLM_BREAKER_FAILURE_THRESHOLD', '3'))
+LLM_BREAKER_RECOVERY_TIMEOUT = int(os.getenv('LLM_BREAKER_RECOVERY_TIMEOUT', '30'))  # Seconds before a half-open probe
+
+# Multi-backend pool
+LLM_POOL_EJECTION_TIME = int(os.getenv('LLM_POOL_EJECTION_TIME', '30'))  # Seconds a failing backend gets no traffic
+
+# Hedged requests across LLM replicas
+LLM_HEDGE_PERCENTILE = float(os.getenv('LLM_HEDGE_PERCENTILE', '95'))  # Latency percentile that triggers a hedge
+LLM_HEDGE_INITIAL_DELAY = 20.0  # Seconds to wait for a full completion before hedging, until enough are sampled
+LLM_HEDGE_MIN_SAMPLES = 20
+LLM_HEDGE_TTFT_INITIAL_DELAY = 2.0  # Seconds to wait for a stream's first token before hedging, until enough are sampled
+LLM_HEDGE_TTFT_MIN_SAMPLES = 20
+LLM_HEDGE_MAX_WORKERS = 16
+
+# Completion cache
+LLM_CACHE_DIR = "data/cache/completions"
+LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', '86400'))  # Seconds a cached completion stays valid
+LLM_CACHE_MAX_ENTRIES = 512  # In-memory LRU size
+LLM_CACHE_MAX_DISK_ENTRIES = int(os.getenv('LLM_CACHE_MAX_DISK_ENTRIES', '10000'))  # Files kept in the disk tier
+
+# Ollama model residency
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '30m')  # How long the model stays loaded after a request
+OLLAMA_NUM_CTX = int(os.getenv('OLLAMA_NUM_CTX', '0'))  # Context window override, 0 keeps the model default
 
 # MCP Server Configuration
-import os
 MCP_SERVER_URL = os.getenv('MCP_BASE_URL', 'http://localhost:8000')
-MCP_TOOLS_CACHE_TTL = 300  # Cache tools list for 5 minutes
\ No newline at end of file
+MCP_TOOLS_CACHE_TTL = 300  # Cache tools list for 5 minutes
+MCP_TOOL_TIMEOUT = float(os.getenv('MCP_TOOL_TIMEOUT', '30'))  # Default deadline per tool call, in seconds
+MCP_TOOL_TIMEOUTS = os.getenv('MCP_TOOL_TIMEOUTS', '')  # Per-tool overrides: "name=seconds,name=seconds"
+MCP_TOOL_MAX_WORKERS = 8  # Tool calls from one assistant message run concurrently
+MCP_POOL_SIZE = 8  # Keep-alive connections per MCP server, enough for concurrent tool calls
+MCP_BATCH_CALLS = os.getenv('MCP_BATCH_CALLS', 'false').lower() == 'true'  # Send tool calls sharing a deadline as one JSON-RPC batch
+MCP_ASYNC_CLIENT = os.getenv('MCP_ASYNC_CLIENT', 'false').lower() == 'true'  # Run tool calls on the shared event loop over HTTP/2
+
+# MCP tool result cache (read-only tools only)
+MCP_TOOL_CACHE_TTL = 300  # Default TTL for tools annotated readOnlyHint
+MCP_TOOL_CACHE_TTLS = os.getenv('MCP_TOOL_CACHE_TTLS', 'get_product_details=300,check_order_status=60')  # "name=seconds", 0 disables
+MCP_TOOL_CACHE_MAX_ENTRIES = 1024
+
+# Tool routing for large MCP catalogs
+TOOL_ROUTER_TOP_K = int(os.getenv('TOOL_ROUTER_TOP_K', '8'))  # Tools offered per turn, 0 offers the whole catalog
+TOOL_ROUTER_ALWAYS_INCLUDE = os.getenv('TOOL_ROUTER_ALWAYS_INCLUDE', '')  # Comma-separated tool names
+TOOL_ROUTER_PRESET_WEIGHT = 0.3  # Weight of prompt preset terms relative to the user turn
+
+# Speculative tool prefetch from entities in the user turn
+# "tool:argument=regex;tool:argument=regex"; the first group, or the whole match, becomes the argument
+TOOL_PREFETCH_PATTERNS = os.getenv(
+    'TOOL_PREFETCH_PATTERNS',
+    r'check_order_status:po_number=\bPO-?\d+\b;get_product_details:query=\b(?!PO-?\d)[A-Z]{2,4}-\d{3,6}\b'
+)
+TOOL_PREFETCH_MAX_CALLS = 4  # Prefetched calls per turn
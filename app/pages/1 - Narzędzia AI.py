@@ -101,6 +101,8 @@ if st.session_state.show_create_form or st.session_state.editing_prompt:
     default_category = 'General'
     default_tags = ''
     default_content = ''
+    default_response_mode = 'default'
+    default_tools = ''
 
     # Load existing data if editing
     if st.session_state.editing_prompt:
@@ -113,6 +115,8 @@ if st.session_state.show_create_form or st.session_state.editing_prompt:
             default_category = prompt_data.get('category', 'General')
             default_tags = ', '.join(prompt_data.get('tags', []))
             default_content = prompt_data.get('content', '')
+            default_response_mode = prompt_data.get('response_mode', 'default')
+            default_tools = ', '.join(prompt_data.get('tools', []))
 
     with st.form("prompt_form"):
         title = st.text_input(translator.get("prompt_title_label"), value=default_title)
@@ -127,6 +131,19 @@ if st.session_state.show_create_form or st.session_state.editing_prompt:
         category = category_keys[category_options.index(category)]
         tags_input = st.text_input(translator.get("prompt_tags_label"), value=default_tags)
         content = st.text_area(translator.get("prompt_content_label"), value=default_content, height=300)
+        response_mode_keys = ["default", "llm", "template"]
+        response_mode = st.selectbox(
+            translator.get("prompt_response_mode_label"),
+            response_mode_keys,
+            index=response_mode_keys.index(default_response_mode) if default_response_mode in response_mode_keys else 0,
+            format_func=lambda mode: translator.get(f"response_modes.{mode}", mode),
+            help=translator.get("prompt_response_mode_help")
+        )
+        tools_input = st.text_input(
+            translator.get("prompt_tools_label"),
+            value=default_tools,
+            help=translator.get("prompt_tools_help")
+        )
 
         # Preview
         if content:
@@ -143,12 +160,15 @@ if st.session_state.show_create_form or st.session_state.editing_prompt:
             else:
                 # Parse tags
                 tags = [tag.strip() for tag in tags_input.split(',') if tag.strip()]
+                pinned_tools = [name.strip() for name in tools_input.split(',') if name.strip()]
 
                 prompt_data = {
                     'title': title.strip(),
                     'category': category,
                     'tags': tags,
                     'content': content.strip(),
+                    'response_mode': response_mode,
+                    'tools': pinned_tools,
                     'updated_at': datetime.now().isoformat()
                 }
 
@@ -4,8 +4,12 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import streamlit as st
 from pathlib import Path
-from utils.config import get_config
+from utils.config import get_config, reload_local_env
 from utils.translator import translator
+from config.constants import MCP_TOOL_CACHE_TTLS
+from services.llm_factory import invalidate_llm_clients
+from services.tool_cache import get_tool_result_cache
+from services.tool_prefetch import get_tool_prefetcher
 import shutil
 
 # Load custom CSS
@@ -64,6 +68,15 @@ def save_settings(settings: dict):
         'LLM_PORT': str(settings['port']),
         'LLM_API_FLAVOR': settings['api_flavor'],
         'LLM_DEFAULT_MODEL': settings['default_model'],
+        'LLM_POOL_SIZE': str(settings['pool_size']),
+        'LLM_ENDPOINTS': settings['endpoints'],
+        'LLM_TOOL_MODEL': settings['tool_model'],
+        'LLM_TOOL_ENDPOINTS': settings['tool_endpoints'],
+        'LLM_ANSWER_MODEL': settings['answer_model'],
+        'LLM_ANSWER_ENDPOINTS': settings['answer_endpoints'],
+        'LLM_ESCALATION_ENABLED': 'true' if settings['escalation_enabled'] else 'false',
+        'LLM_TOOL_CALLING': settings['tool_calling'],
+        'LLM_STRUCTURED_OUTPUT': 'true' if settings['structured_output'] else 'false',
         'FLOWHUB_HOOKS_ENABLED': 'true' if settings['flowhub_enabled'] else 'false',
         'FLOWHUB_WEBHOOK_URL': settings['flowhub_url']
     })
@@ -75,6 +88,10 @@ def save_settings(settings: dict):
         for key, value in existing_content.items():
             f.write(f"{key}={value}\n")
 
+    # Apply the new values, then drop pooled LLM clients so the next request connects to the new endpoint
+    reload_local_env()
+    invalidate_llm_clients()
+
     st.success(translator.get("status_messages.success"))
 
 # Load current config
@@ -141,6 +158,68 @@ with st.form("llm_settings"):
         help=translator.get("model_label")
     )
 
+    endpoints = st.text_input(
+        translator.get("endpoints_label"),
+        value=config['llm_endpoints'],
+        help=translator.get("endpoints_help")
+    )
+
+    pool_size = st.number_input(
+        translator.get("pool_size_label"),
+        value=config['llm_pool_size'],
+        min_value=1,
+        max_value=100,
+        help=translator.get("pool_size_help")
+    )
+
+    st.header(translator.get("stage_models_title"))
+
+    tool_model = st.text_input(
+        translator.get("tool_model_label"),
+        value=config['llm_tool_model'],
+        help=translator.get("tool_model_help")
+    )
+
+    tool_endpoints = st.text_input(
+        translator.get("tool_endpoints_label"),
+        value=config['llm_tool_endpoints'],
+        help=translator.get("tool_endpoints_help")
+    )
+
+    answer_model = st.text_input(
+        translator.get("answer_model_label"),
+        value=config['llm_answer_model'],
+        help=translator.get("answer_model_help")
+    )
+
+    answer_endpoints = st.text_input(
+        translator.get("answer_endpoints_label"),
+        value=config['llm_answer_endpoints'],
+        help=translator.get("answer_endpoints_help")
+    )
+
+    escalation_enabled = st.checkbox(
+        translator.get("escalation_enabled_label"),
+        value=config['llm_escalation_enabled'],
+        help=translator.get("escalation_enabled_help")
+    )
+
+    tool_calling_modes = translator.get("tool_calling_modes")
+    tool_calling_options = list(tool_calling_modes.keys())
+    tool_calling = st.selectbox(
+        translator.get("tool_calling_label"),
+        tool_calling_options,
+        index=tool_calling_options.index(config['llm_tool_calling']) if config['llm_tool_calling'] in tool_calling_options else 0,
+        format_func=lambda x: tool_calling_modes[x],
+        help=translator.get("tool_calling_help")
+    )
+
+    structured_output = st.checkbox(
+        translator.get("structured_output_label"),
+        value=config['llm_structured_output'],
+        help=translator.get("structured_output_help")
+    )
+
     st.header(translator.get("flowhub_settings_title"))
 
     flowhub_enabled = st.checkbox(
@@ -166,16 +245,25 @@ st.info(translator.get("using_minimal_theme"))
 if st.button(translator.get("reset_theme_button"), type="secondary"):
     apply_theme("minimal")
 
-    if submitted:
-        settings = {
-            'base_url': base_url,
-            'port': port,
-            'api_flavor': api_flavor,
-            'default_model': default_model,
-            'flowhub_enabled': flowhub_enabled,
-            'flowhub_url': flowhub_url
-        }
-        save_settings(settings)
+if submitted:
+    settings = {
+        'base_url': base_url,
+        'port': port,
+        'api_flavor': api_flavor,
+        'default_model': default_model,
+        'pool_size': pool_size,
+        'endpoints': endpoints,
+        'tool_model': tool_model,
+        'tool_endpoints': tool_endpoints,
+        'answer_model': answer_model,
+        'answer_endpoints': answer_endpoints,
+        'escalation_enabled': escalation_enabled,
+        'tool_calling': tool_calling,
+        'structured_output': structured_output,
+        'flowhub_enabled': flowhub_enabled,
+        'flowhub_url': flowhub_url
+    }
+    save_settings(settings)
 
 # Current Configuration Display
 st.header(translator.get("current_config_title"))
@@ -186,12 +274,26 @@ env_vars = {
     'LLM_PORT': config['llm_port'],
     'LLM_API_FLAVOR': config['llm_api_flavor'],
     'LLM_DEFAULT_MODEL': config['llm_default_model'],
+    'LLM_POOL_SIZE': config['llm_pool_size'],
+    'LLM_ENDPOINTS': config['llm_endpoints'],
+    'LLM_TOOL_MODEL': config['llm_tool_model'],
+    'LLM_TOOL_ENDPOINTS': config['llm_tool_endpoints'],
+    'LLM_ANSWER_MODEL': config['llm_answer_model'],
+    'LLM_ANSWER_ENDPOINTS': config['llm_answer_endpoints'],
+    'LLM_ESCALATION_ENABLED': config['llm_escalation_enabled'],
+    'LLM_TOOL_CALLING': config['llm_tool_calling'],
+    'LLM_STRUCTURED_OUTPUT': config['llm_structured_output'],
+    'LLM_CACHE_MODE': config['llm_cache_mode'],
+    'RESPONSE_MODE': config['response_mode'],
+    'MCP_TOOL_CACHE_TTLS': MCP_TOOL_CACHE_TTLS,
+    'TOOL_PREFETCH_ENABLED': config['tool_prefetch_enabled'],
     'FLOWHUB_HOOKS_ENABLED': config['flowhub_hooks_enabled'],
     'FLOWHUB_WEBHOOK_URL': config['flowhub_webhook_url']
 }
 
 for key, value in env_vars.items():
-    if key == 'FLOWHUB_WEBHOOK_URL' and not value:
+    if key in ('FLOWHUB_WEBHOOK_URL', 'LLM_ENDPOINTS', 'LLM_TOOL_MODEL', 'LLM_TOOL_ENDPOINTS',
+               'LLM_ANSWER_MODEL', 'LLM_ANSWER_ENDPOINTS') and not value:
         st.caption(f"{key}: {translator.get('not_set')}")
     else:
         st.caption(f"{key}: {value}")
@@ -201,6 +303,27 @@ st.header(translator.get("file_locations_title"))
 st.caption(f"{translator.get('settings_file_caption')} {Path('.env.local').absolute()}")
 st.caption(f"{translator.get('prompts_directory_caption')} {Path('data/prompts').absolute()}")
 
+# MCP tool result cache
+st.header(translator.get("tool_cache_title"))
+tool_cache = get_tool_result_cache()
+tool_cache_stats = tool_cache.stats()
+st.caption(translator.get("tool_cache_stats").format(
+    hit_rate=tool_cache_stats['hit_rate'] * 100,
+    hits=tool_cache_stats['hits'],
+    misses=tool_cache_stats['misses'],
+    entries=tool_cache_stats['entries']
+))
+if st.button(translator.get("tool_cache_clear_button"), type="secondary"):
+    removed = tool_cache.invalidate()
+    st.success(translator.get("tool_cache_cleared").format(count=removed))
+prefetch_stats = get_tool_prefetcher().stats()
+st.caption(translator.get("tool_prefetch_stats").format(
+    hit_rate=prefetch_stats['hit_rate'] * 100,
+    hits=prefetch_stats['hits'],
+    wasted=prefetch_stats['wasted'],
+    started=prefetch_stats['started']
+))
+
 # Instructions
 st.header(translator.get("instructions_title"))
 st.markdown(translator.get("settings_instructions"))
@@ -209,16 +332,26 @@ st.markdown(translator.get("settings_instructions"))
 st.header(translator.get("test_connection_button"))
 if st.button(translator.get("test_connection_button")):
     try:
-        from services.llm_factory import get_llm_client
+        from services.llm_factory import get_llm_client, parse_endpoints
 
         client = get_llm_client(
             config['llm_api_flavor'],
             config['llm_base_url'],
-            config['llm_port']
+            config['llm_port'],
+            pool_size=config['llm_pool_size'],
+            endpoints=parse_endpoints(config['llm_endpoints'])
         )
 
         models = client.models()
         st.success(f"{translator.get('connection_success')}! {translator.get('available_models')}: {', '.join(models[:5])}")
 
+        capabilities = client.capabilities(config['llm_default_model'])
+        st.caption(translator.get("capabilities_caption").format(
+            model=config['llm_default_model'],
+            native_tools=translator.get("yes" if capabilities['native_tools'] else "no"),
+            json_schema=translator.get("yes" if capabilities['json_schema'] else "no"),
+            context_length=capabilities['context_length'] or translator.get("unknown")
+        ))
+
     except Exception as e:
         st.error(f"{translator.get('connection_failed')}: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,310 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import httpx
+import requests
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+from requests.adapters import HTTPAdapter
+from ..llm_client import LLMClient, DEFAULT_CAPABILITIES
+from ..single_flight import SingleFlight
+from ..tool_prompt import compact_json, get_tools_json
+from ..event_loop import close_on_loop
+from .resilience import (RetryPolicy, BackendUnavailableError, get_circuit_breaker, call_with_resilience,
+                         acall_with_resilience)
+from utils.logging import get_logger
+from config.constants import LLM_POOL_SIZE, LLM_CONNECT_TIMEOUT, LLM_PROBE_TIMEOUT, LLM_PROBE_FAILURE_TTL
+
+logger = get_logger(__name__)
+
+# Process-wide coalescing of identical in-flight LLM requests
+llm_single_flight = SingleFlight()
+
+
+def create_session(pool_size: int = LLM_POOL_SIZE) -> requests.Session:
+    """Create a requests session with a keep-alive connection pool.
+
+    Args:
+        pool_size: Maximum number of pooled connections per host
+
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def iter_sse_events(response: requests.Response) -> Iterator[Dict[str, Any]]:
+    """Yield JSON payloads from a server-sent events stream.
+
+    Stops at the OpenAI-style ``data: [DONE]`` sentinel.
+    """
+    # SSE is always UTF-8; requests assumes ISO-8859-1 for text/* without a charset
+    response.encoding = "utf-8"
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+
+def iter_ndjson(response: requests.Response) -> Iterator[Dict[str, Any]]:
+    """Yield JSON objects from a newline-delimited JSON stream."""
+    response.encoding = "utf-8"
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+
+def encode_payload(payload: Dict[str, Any]) -> bytes:
+    """Serialize a request body, splicing in the cached JSON of its tools array.
+
+    The tools array is usually the largest and least changing part of a
+    request, so it is serialized once per distinct tool list.
+    """
+    tools = payload.get("tools")
+    if not tools:
+        return compact_json(payload).encode("utf-8")
+
+    rest = compact_json({key: value for key, value in payload.items() if key != "tools"})
+    separator = "," if len(rest) > 2 else ""
+    return f'{rest[:-1]}{separator}"tools":{get_tools_json(tools)}}}'.encode("utf-8")
+
+
+# Minimal OpenAI-style requests used to detect optional backend features
+_PROBE_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "probe",
+        "description": "Report that tools work.",
+        "parameters": {"type": "object", "properties": {"ok": {"type": "boolean"}}, "required": ["ok"]}
+    }
+}
+
+_PROBE_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "probe",
+        "schema": {"type": "object", "properties": {"ok": {"type": "boolean"}}, "required": ["ok"]}
+    }
+}
+
+# A failed probe falls back to defaults for a while instead of retrying
+_PROBE_RETRY_POLICY = RetryPolicy(max_attempts=1)
+
+
+def _probe_payload(model: str) -> Dict[str, Any]:
+    return {"model": model, "temperature": 0, "max_tokens": 32, "stream": False}
+
+
+def _json_headers(headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    return {"Content-Type": "application/json", **(headers or {})}
+
+
+class HTTPLLMClient(LLMClient):
+    """Base class for LLM adapters that talk to their backend over pooled HTTP."""
+
+    def __init__(self, base_url: str, port: int, pool_size: int = LLM_POOL_SIZE):
+        self.base_url = base_url.rstrip('/')
+        self.port = port
+        self.pool_size = pool_size
+        self.session = create_session(pool_size)
+        # Shared by every client instance talking to the same endpoint
+        self.breaker = get_circuit_breaker(f"{self.base_url}:{self.port}")
+        self.retry_policy = RetryPolicy()
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_lock = threading.Lock()
+        self._capabilities: Dict[str, Dict[str, Any]] = {}
+        self._probe_failed_until: Dict[str, float] = {}
+        self._capabilities_lock = threading.Lock()
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get the pooled async HTTP client bound to the running event loop.
+
+        httpx connections cannot cross event loops, so a new client is
+        created if this one is first used from a different loop, and the
+        old one is closed on its own loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            if self._async_client is not None and self._async_loop is not loop:
+                # The old client's connections belong to its own loop
+                close_on_loop(self._async_client, self._async_loop)
+                self._async_client = None
+            if self._async_client is None:
+                self._async_client = httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=self.pool_size,
+                                        max_keepalive_connections=self.pool_size)
+                )
+                self._async_loop = loop
+            return self._async_client
+
+    def _post_json(self, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None,
+                   timeout: float = 60) -> Dict[str, Any]:
+        """POST a JSON request through the circuit breaker and return the JSON response.
+
+        Identical requests already in flight are coalesced into one upstream call.
+        """
+        body = encode_payload(payload)
+        headers = _json_headers(headers)
+
+        def send():
+            response = self.session.post(url, data=body, headers=headers,
+                                         timeout=(LLM_CONNECT_TIMEOUT, timeout))
+            response.raise_for_status()
+            return response.json()
+
+        key = hashlib.sha256(url.encode("utf-8") + b"\n" + body).hexdigest()
+        return llm_single_flight.do(key, lambda: call_with_resilience(self.breaker, self.retry_policy, send))
+
+    async def _apost_json(self, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None,
+                          timeout: float = 60) -> Dict[str, Any]:
+        """Async counterpart of _post_json()."""
+        body = encode_payload(payload)
+        headers = _json_headers(headers)
+
+        async def send():
+            response = await self._get_async_client().post(
+                url, content=body, headers=headers,
+                timeout=httpx.Timeout(timeout, connect=LLM_CONNECT_TIMEOUT)
+            )
+            response.raise_for_status()
+            return response.json()
+
+        key = hashlib.sha256(url.encode("utf-8") + b"\n" + body).hexdigest()
+        return await llm_single_flight.ado(key, lambda: acall_with_resilience(self.breaker, self.retry_policy, send))
+
+    @contextmanager
+    def _open_stream(self, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None,
+                     timeout: float = 60) -> Iterator[requests.Response]:
+        """Open a streaming POST through the circuit breaker.
+
+        Retries only cover establishing the response, never a partially
+        consumed stream.
+        """
+        body = encode_payload(payload)
+        headers = _json_headers(headers)
+
+        def send():
+            response = self.session.post(url, data=body, headers=headers,
+                                         timeout=(LLM_CONNECT_TIMEOUT, timeout), stream=True)
+            try:
+                response.raise_for_status()
+            except requests.HTTPError:
+                response.close()
+                raise
+            return response
+
+        response = call_with_resilience(self.breaker, self.retry_policy, send)
+        try:
+            yield response
+        finally:
+            response.close()
+
+    def capabilities(self, model: str) -> Dict[str, Any]:
+        """Get what the backend supports for a model, probing it on first use.
+
+        Probes go through the circuit breaker without retries. A failed
+        probe falls back to the defaults for LLM_PROBE_FAILURE_TTL seconds
+        before the backend is probed again.
+        """
+        with self._capabilities_lock:
+            known = self._capabilities.get(model)
+            failed_until = self._probe_failed_until.get(model, 0.0)
+        if known is not None:
+            return dict(known)
+        if time.monotonic() < failed_until:
+            return dict(DEFAULT_CAPABILITIES)
+
+        try:
+            probed = {**DEFAULT_CAPABILITIES, **call_with_resilience(
+                self.breaker, _PROBE_RETRY_POLICY, lambda: self._probe_capabilities(model))}
+        except (requests.RequestException, BackendUnavailableError, ValueError, KeyError) as e:
+            logger.warning(f"Capability probe failed for {model} at {self.base_url}:{self.port}: {e}")
+            with self._capabilities_lock:
+                self._probe_failed_until[model] = time.monotonic() + LLM_PROBE_FAILURE_TTL
+            return dict(DEFAULT_CAPABILITIES)
+
+        logger.info(f"Capabilities of {model} at {self.base_url}:{self.port}: {probed}")
+        with self._capabilities_lock:
+            self._capabilities[model] = probed
+        return dict(probed)
+
+    def _probe_capabilities(self, model: str) -> Dict[str, Any]:
+        """Detect the optional features a model supports; adapters override this."""
+        return {}
+
+    def _probe_chat(self, url: str, payload: Dict[str, Any],
+                    headers: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """Send a probe chat completion; returns its message, or None if the request was rejected."""
+        response = self.session.post(url, data=compact_json(payload).encode("utf-8"), headers=_json_headers(headers),
+                                     timeout=(LLM_CONNECT_TIMEOUT, LLM_PROBE_TIMEOUT))
+        if 400 <= response.status_code < 500:
+            return None
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]
+
+    def _probe_openai_features(self, url: str, model: str,
+                               headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Probe native tool calls and JSON schema output on an OpenAI-style chat endpoint.
+
+        Servers that ignore unknown fields answer 200 either way, so a
+        feature counts as supported only if the reply actually uses it.
+        """
+        message = self._probe_chat(url, {
+            **_probe_payload(model),
+            "messages": [{"role": "user", "content": "Call the probe tool with ok set to true."}],
+            "tools": [_PROBE_TOOL],
+            "tool_choice": {"type": "function", "function": {"name": "probe"}}
+        }, headers)
+        native_tools = bool(message and message.get("tool_calls"))
+
+        return {"native_tools": native_tools, "json_schema": self._probe_json_schema(url, model, headers)}
+
+    def _probe_json_schema(self, url: str, model: str, headers: Optional[Dict[str, str]] = None) -> bool:
+        """Probe JSON schema constrained output on an OpenAI-style chat endpoint."""
+        message = self._probe_chat(url, {
+            **_probe_payload(model),
+            "messages": [{"role": "user", "content": 'Reply with {"ok": true}.'}],
+            "response_format": _PROBE_SCHEMA
+        }, headers)
+        try:
+            return isinstance(json.loads((message or {}).get("content") or ""), dict)
+        except json.JSONDecodeError:
+            return False
+
+    def close(self):
+        """Close pooled connections held by this client."""
+        self.session.close()
+        with self._async_lock:
+            async_client, loop = self._async_client, self._async_loop
+            self._async_client = None
+            self._async_loop = None
+
+        if async_client is not None:
+            close_on_loop(async_client, loop)
+
+    async def aclose(self):
+        """Close pooled async connections held by this client."""
+        with self._async_lock:
+            async_client = self._async_client
+            self._async_client = None
+            self._async_loop = None
+
+        if async_client is not None:
+            await async_client.aclose()
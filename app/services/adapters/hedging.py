@@ -0,0 +1,276 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterator, Callable
+from ..llm_client import LLMClient, merge_capabilities
+from ..event_loop import run_coroutine
+from utils.logging import get_logger
+from config.constants import (
+    LLM_HEDGE_PERCENTILE, LLM_HEDGE_INITIAL_DELAY, LLM_HEDGE_MIN_SAMPLES, LLM_HEDGE_TTFT_INITIAL_DELAY,
+    LLM_HEDGE_TTFT_MIN_SAMPLES, LLM_HEDGE_MAX_WORKERS
+)
+
+logger = get_logger(__name__)
+
+# Shared by all hedged clients; bounds the threads spent on racing replicas
+_hedge_executor = ThreadPoolExecutor(max_workers=LLM_HEDGE_MAX_WORKERS, thread_name_prefix="llm-hedge")
+
+_STREAM_DONE = object()
+
+
+class LatencyWindow:
+    """Recent latencies of one kind of request and the hedge delay derived from them."""
+
+    def __init__(self, initial_delay: float, min_samples: int, window: int = 200):
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.samples: deque = deque(maxlen=window)
+
+    def delay(self, percentile: float) -> float:
+        """The given percentile of recent latencies, or the initial delay until enough are sampled."""
+        samples = sorted(self.samples)
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+
+
+class HedgedLLMClient(LLMClient):
+    """LLMClient that hedges slow requests onto a second replica.
+
+    The request goes to the least busy replica first. If no response (or,
+    for streams, no first token) arrives within the configured percentile
+    of recent latencies, the same request is sent to the next replica. The
+    first answer wins and the other request's connection is closed, so the
+    losing backend stops generating. Sync requests are raced on the shared
+    event loop for that reason.
+
+    Full completions and time to first token are sampled in separate
+    windows, since the two differ by orders of magnitude.
+    """
+
+    def __init__(self, replicas: List[LLMClient], percentile: float = LLM_HEDGE_PERCENTILE,
+                 initial_delay: float = LLM_HEDGE_INITIAL_DELAY, min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+                 ttft_initial_delay: float = LLM_HEDGE_TTFT_INITIAL_DELAY,
+                 ttft_min_samples: int = LLM_HEDGE_TTFT_MIN_SAMPLES, window: int = 200):
+        if len(replicas) < 2:
+            raise ValueError("HedgedLLMClient needs at least two replicas")
+        self.replicas = replicas
+        self.percentile = percentile
+        # Full completion times, and time to first token of streams
+        self._latencies = {
+            "completion": LatencyWindow(initial_delay, min_samples, window),
+            "stream": LatencyWindow(ttft_initial_delay, ttft_min_samples, window)
+        }
+        self._in_flight = [0] * len(replicas)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "hedges_fired": 0, "hedges_won": 0}
+
+    def hedge_delay(self, kind: str = "completion") -> float:
+        """Seconds to wait for the primary before hedging.
+
+        Args:
+            kind: "completion" for full responses, "stream" for a stream's first token
+        """
+        with self._lock:
+            return self._latencies[kind].delay(self.percentile)
+
+    def _pick(self) -> List[int]:
+        """Order replica indexes by in-flight requests, least busy first."""
+        with self._lock:
+            self._stats["requests"] += 1
+            return sorted(range(len(self.replicas)), key=lambda i: self._in_flight[i])[:2]
+
+    def _enter(self, index: int):
+        with self._lock:
+            self._in_flight[index] += 1
+
+    def _exit(self, index: int):
+        with self._lock:
+            self._in_flight[index] -= 1
+
+    def _record(self, kind: str, latency: float, hedged: bool, hedge_won: bool):
+        with self._lock:
+            self._latencies[kind].samples.append(latency)
+            if hedged:
+                self._stats["hedges_fired"] += 1
+            if hedge_won:
+                self._stats["hedges_won"] += 1
+
+    async def _ahedged_call(self, call: Callable[[LLMClient], Any]) -> Dict[str, Any]:
+        """Race a call across a primary and, if it is slow, a secondary replica.
+
+        The losing task is cancelled, which closes its HTTP connection so
+        the backend stops generating.
+        """
+        primary, secondary = self._pick()
+        started = time.monotonic()
+
+        async def run(index: int) -> Dict[str, Any]:
+            self._enter(index)
+            try:
+                return await call(self.replicas[index])
+            finally:
+                self._exit(index)
+
+        delay = self.hedge_delay()
+        tasks: Dict[asyncio.Task, int] = {asyncio.ensure_future(run(primary)): primary}
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        hedged = not done
+        if hedged:
+            logger.info(f"Primary replica slower than {delay:.2f}s, hedging request")
+            tasks[asyncio.ensure_future(run(secondary))] = secondary
+
+        error: Optional[BaseException] = None
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    self._record("completion", time.monotonic() - started, hedged, tasks[task] == secondary)
+                    return task.result()
+
+                if error is not None and not hedged:
+                    hedged = True
+                    tasks[asyncio.ensure_future(run(secondary))] = secondary
+                    pending = {t for t in tasks if not t.done()}
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        raise error
+
+    def chat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Send a chat request, hedging if the primary is slow."""
+        return self.chat_with_tools(messages, tools=None, **kwargs)
+
+    def chat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                       tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Send a chat request with tools, hedging if the primary is slow.
+
+        Runs the async race on the shared event loop: a running sync request
+        cannot be interrupted, so the loser would keep generating.
+        """
+        return run_coroutine(self.achat_with_tools(messages, tools=tools, tool_choice=tool_choice, **kwargs))
+
+    async def achat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Async chat request, hedging if the primary is slow."""
+        return await self._ahedged_call(lambda client: client.achat(messages, **kwargs))
+
+    async def achat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                               tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Async chat request with tools, hedging if the primary is slow."""
+        return await self._ahedged_call(lambda client: client.achat_with_tools(messages, tools=tools,
+                                                                               tool_choice=tool_choice, **kwargs))
+
+    def chat_stream(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                    tool_choice: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """Stream a chat response, hedging if the primary's first token is slow.
+
+        Each replica streams into its own queue from a worker thread; the
+        first replica to produce a token wins and the other stream is closed.
+        """
+        primary, secondary = self._pick()
+        started = time.monotonic()
+        delay = self.hedge_delay("stream")
+        output: "queue.Queue" = queue.Queue()
+        cancelled = {primary: threading.Event(), secondary: threading.Event()}
+
+        def pump(index: int):
+            self._enter(index)
+            stream = self.replicas[index].chat_stream(messages, tools=tools, tool_choice=tool_choice, **kwargs)
+            try:
+                for chunk in stream:
+                    if cancelled[index].is_set():
+                        break
+                    output.put((index, chunk))
+                output.put((index, _STREAM_DONE))
+            except Exception as e:
+                output.put((index, e))
+            finally:
+                # Closing the generator closes the HTTP response, stopping generation upstream
+                stream.close()
+                self._exit(index)
+
+        _hedge_executor.submit(pump, primary)
+        racers = {primary}
+        winner: Optional[int] = None
+        hedged = False
+        failed = set()
+
+        try:
+            while True:
+                timeout = None
+                if winner is None and not hedged:
+                    timeout = max(0.0, delay - (time.monotonic() - started))
+                try:
+                    index, item = output.get(timeout=timeout)
+                except queue.Empty:
+                    hedged = True
+                    racers.add(secondary)
+                    _hedge_executor.submit(pump, secondary)
+                    continue
+
+                if winner is not None and index != winner:
+                    continue
+
+                if isinstance(item, Exception):
+                    failed.add(index)
+                    if winner is None and not hedged:
+                        hedged = True
+                        racers.add(secondary)
+                        _hedge_executor.submit(pump, secondary)
+                        continue
+                    if winner is None and failed < racers:
+                        continue
+                    raise item
+
+                if winner is None:
+                    winner = index
+                    for other in racers - {index}:
+                        cancelled[other].set()
+                    self._record("stream", time.monotonic() - started, hedged, index == secondary)
+
+                if item is _STREAM_DONE:
+                    return
+                yield item
+        finally:
+            for event in cancelled.values():
+                event.set()
+
+    def models(self) -> List[str]:
+        """Get available models from the replicas."""
+        models: List[str] = []
+        for replica in self.replicas:
+            for model in replica.models():
+                if model not in models:
+                    models.append(model)
+        return models
+
+    def capabilities(self, model: str) -> Dict[str, Any]:
+        """Get the capabilities every replica supports, since any replica may answer."""
+        return merge_capabilities([replica.capabilities(model) for replica in self.replicas])
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hedge accounting: how often hedges fire and how often they win."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["hedge_delay"] = self.hedge_delay("completion")
+        stats["stream_hedge_delay"] = self.hedge_delay("stream")
+        stats["fire_rate"] = stats["hedges_fired"] / stats["requests"] if stats["requests"] else 0.0
+        stats["win_rate"] = stats["hedges_won"] / stats["hedges_fired"] if stats["hedges_fired"] else 0.0
+        return stats
+
+    def close(self):
+        """Close connection pools of all replicas."""
+        for replica in self.replicas:
+            close = getattr(replica, "close", None)
+            if close:
+                close()
@@ -1,104 +1,155 @@
+import httpx
 import requests
-import json
-from typing import List, Dict, Any, Optional
-from ..llm_client import LLMClient
+from typing import List, Dict, Any, Optional, Iterator
+from .base import HTTPLLMClient, iter_sse_events
+from ..tool_call_parser import parse_tool_calls
+from utils.logging import get_logger
+from config.constants import LLM_POOL_SIZE
 
+logger = get_logger(__name__)
 
-class LMStudioClient(LLMClient):
+
+class LMStudioClient(HTTPLLMClient):
     """Client for LM Studio local server (OpenAI-compatible)."""
 
-    def __init__(self, base_url: str, port: int):
-        self.base_url = base_url.rstrip('/')
-        self.port = port
+    def __init__(self, base_url: str, port: int, pool_size: int = LLM_POOL_SIZE):
+        super().__init__(base_url, port, pool_size)
         # LM Studio typically uses OpenAI-compatible endpoints
         self.endpoint = f"{self.base_url}:{self.port}/v1/chat/completions"
 
-    def chat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
-        """Send chat completion request to LM Studio."""
-        return self.chat_with_tools(messages, tools=None, **kwargs)
-
-    def chat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
-                       tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
-        """Send chat completion request with tool support to LM Studio."""
-        headers = {"Content-Type": "application/json"}
-
+    def _build_payload(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]],
+                       tool_choice: Optional[str], stream: bool, **kwargs) -> Dict[str, Any]:
+        """Build the chat completion request body."""
         payload = {
             "messages": messages,
             "model": kwargs.get("model", "local-model"),
             "temperature": kwargs.get("temperature", 0.7),
             "max_tokens": kwargs.get("max_tokens", 1000),
-            "stream": False
+            "stream": stream
         }
+        if kwargs.get("response_format"):
+            payload["response_format"] = kwargs["response_format"]
 
         # Add tools if provided
         if tools:
             payload["tools"] = tools
             if tool_choice:
                 payload["tool_choice"] = tool_choice
-            print(f"DEBUG LMStudio: Sending {len(tools)} tools to LM Studio")
-            for tool in tools[:2]:
-                print(f"DEBUG LMStudio: Tool name: {tool['function']['name']}")
+            logger.debug(f"Sending {len(tools)} tools to LM Studio: "
+                         f"{[tool['function']['name'] for tool in tools[:2]]}")
+
+        return payload
+
+    def chat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Send chat completion request to LM Studio."""
+        return self.chat_with_tools(messages, tools=None, **kwargs)
+
+    def chat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                       tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Send chat completion request with tool support to LM Studio."""
+        headers = {"Content-Type": "application/json"}
+        payload = self._build_payload(messages, tools, tool_choice, stream=False, **kwargs)
 
         try:
-            response = requests.post(self.endpoint, json=payload, headers=headers, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            data = self._post_json(self.endpoint, payload, headers=headers, timeout=30)
+            return self._parse_response(data, payload)
+        except requests.RequestException as e:
+            raise Exception(f"LM Studio API request failed: {str(e)}")
 
-            result = {
-                "content": data["choices"][0]["message"]["content"],
-                "usage": data.get("usage", {}),
-                "model": data.get("model", payload["model"])
-            }
-
-            # Include tool calls if present
-            message = data["choices"][0]["message"]
-            if "tool_calls" in message and message["tool_calls"]:
-                result["tool_calls"] = message["tool_calls"]
-                print(f"DEBUG LMStudio: Received {len(message['tool_calls'])} tool calls from LM Studio")
-                for tc in message["tool_calls"]:
-                    print(f"DEBUG LMStudio: Tool call: {tc['function']['name']}")
-            else:
-                # Check for custom tool format in content
-                content = message.get("content", "")
-                if content.startswith("<|start|>assistant<|channel|>commentary to=functions."):
-                    try:
-                        # Extract tool name
-                        start_tool = content.find("functions.") + len("functions.")
-                        end_tool = content.find(" <|constrain|>")
-                        tool_name = content[start_tool:end_tool]
-
-                        # Extract JSON args
-                        start_json = content.find("<|message|>") + len("<|message|>")
-                        json_str = content[start_json:].strip()
-                        if json_str.startswith("{") and json_str.endswith("}"):
-                            args = json.loads(json_str)
-
-                            # Convert to OpenAI format
-                            result["tool_calls"] = [{
-                                "id": f"call_{hash(content)}",
-                                "type": "function",
-                                "function": {
-                                    "name": tool_name,
-                                    "arguments": json.dumps(args)
-                                }
-                            }]
-                            # Remove the tool call from content
-                            result["content"] = ""
-                            print(f"DEBUG LMStudio: Parsed custom tool call from content: {tool_name} with args: {args}")
-                    except (ValueError, json.JSONDecodeError) as e:
-                        print(f"DEBUG LMStudio: Failed to parse custom tool format from content: {e}")
-
-            return result
+    async def achat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Send chat completion request to LM Studio asynchronously."""
+        return await self.achat_with_tools(messages, tools=None, **kwargs)
+
+    async def achat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                               tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Send chat completion request with tool support to LM Studio asynchronously."""
+        headers = {"Content-Type": "application/json"}
+        payload = self._build_payload(messages, tools, tool_choice, stream=False, **kwargs)
+
+        try:
+            data = await self._apost_json(self.endpoint, payload, headers=headers, timeout=30)
+            return self._parse_response(data, payload)
+        except httpx.HTTPError as e:
+            raise Exception(f"LM Studio API request failed: {str(e)}")
+
+    def _parse_response(self, data: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a chat completion response into the client result format."""
+        result = {
+            "content": data["choices"][0]["message"]["content"],
+            "usage": data.get("usage", {}),
+            "model": data.get("model", payload["model"])
+        }
+
+        # Include tool calls if present
+        message = data["choices"][0]["message"]
+        if "tool_calls" in message and message["tool_calls"]:
+            result["tool_calls"] = message["tool_calls"]
+            logger.debug(f"Received tool calls from LM Studio: "
+                         f"{[tc['function']['name'] for tc in message['tool_calls']]}")
+        else:
+            # Check for tool calls written into the content
+            remaining, tool_calls = parse_tool_calls(message.get("content") or "")
+            if tool_calls:
+                result["tool_calls"] = tool_calls
+                # Remove the tool calls from content
+                result["content"] = remaining
+                logger.debug(f"Parsed tool calls from LM Studio content: "
+                             f"{[tc['function']['name'] for tc in tool_calls]}")
+
+        return result
+
+    def chat_stream(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                    tool_choice: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """Stream chat completion content from LM Studio's SSE response."""
+        headers = {"Content-Type": "application/json"}
+        payload = self._build_payload(messages, tools, tool_choice, stream=True, **kwargs)
+
+        try:
+            with self._open_stream(self.endpoint, payload, headers=headers, timeout=30) as response:
+                for event in iter_sse_events(response):
+                    choices = event.get("choices") or []
+                    if not choices:
+                        continue
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if delta:
+                        yield delta
         except requests.RequestException as e:
             raise Exception(f"LM Studio API request failed: {str(e)}")
 
+    def _probe_capabilities(self, model: str) -> Dict[str, Any]:
+        """Read capabilities from LM Studio's model API, probing servers that lack it."""
+        try:
+            response = self.session.get(f"{self.base_url}:{self.port}/api/v0/models/{model}", timeout=10)
+            response.raise_for_status()
+            info = response.json()
+        except (requests.RequestException, ValueError):
+            return self._probe_openai_features(self.endpoint, model)
+
+        return {
+            "native_tools": "tool_use" in (info.get("capabilities") or []),
+            # The model API does not report structured output support
+            "json_schema": self._probe_json_schema(self.endpoint, model),
+            "context_length": info.get("loaded_context_length") or info.get("max_context_length")
+        }
+
     def models(self) -> List[str]:
         """Get available models from LM Studio."""
         try:
-            response = requests.get(f"{self.base_url}:{self.port}/v1/models", timeout=10)
+            response = self.session.get(f"{self.base_url}:{self.port}/v1/models", timeout=10)
             response.raise_for_status()
             data = response.json()
             return [model["id"] for model in data.get("data", [])]
         except requests.RequestException:
             # LM Studio might not have models endpoint, return default
-            return ["local-model"]
\ No newline at end of file
+            return ["local-model"]
+
+    async def amodels(self) -> List[str]:
+        """Get available models from LM Studio asynchronously."""
+        try:
+            response = await self._get_async_client().get(f"{self.base_url}:{self.port}/v1/models", timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            return [model["id"] for model in data.get("data", [])]
+        except httpx.HTTPError:
+            # LM Studio might not have models endpoint, return default
+            return ["local-model"]
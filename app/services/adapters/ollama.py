@@ -1,15 +1,123 @@
+import json
+import httpx
 import requests
-from typing import List, Dict, Any, Optional
-from ..llm_client import LLMClient
+from typing import List, Dict, Any, Optional, Iterator, Union
+from .base import HTTPLLMClient, iter_ndjson
+from ..tool_call_parser import make_call_id
+from config.constants import LLM_POOL_SIZE, LLM_CONNECT_TIMEOUT, LLM_PROBE_TIMEOUT, OLLAMA_KEEP_ALIVE, OLLAMA_NUM_CTX
 
 
-class OllamaClient(LLMClient):
-    """Client for Ollama API."""
+class OllamaClient(HTTPLLMClient):
+    """Client for Ollama's native /api/chat message and tool protocol."""
 
-    def __init__(self, base_url: str, port: int):
-        self.base_url = base_url.rstrip('/')
-        self.port = port
+    def __init__(self, base_url: str, port: int, pool_size: int = LLM_POOL_SIZE,
+                 keep_alive: Union[str, int] = OLLAMA_KEEP_ALIVE, num_ctx: int = OLLAMA_NUM_CTX):
+        super().__init__(base_url, port, pool_size)
         self.endpoint = f"{self.base_url}:{self.port}/api/chat"
+        # Keep the model resident between requests so its KV cache can be reused
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+
+    def _convert_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert OpenAI-style messages to Ollama chat messages.
+
+        Ollama expects tool call arguments as objects rather than JSON strings.
+        """
+        converted = []
+        for msg in messages:
+            ollama_msg = {
+                "role": msg.get("role", "user"),
+                "content": msg.get("content") or ""
+            }
+
+            if msg.get("tool_calls"):
+                ollama_msg["tool_calls"] = []
+                for tc in msg["tool_calls"]:
+                    arguments = tc["function"].get("arguments", {})
+                    if isinstance(arguments, str):
+                        try:
+                            arguments = json.loads(arguments) if arguments else {}
+                        except json.JSONDecodeError:
+                            arguments = {}
+                    ollama_msg["tool_calls"].append({
+                        "function": {"name": tc["function"]["name"], "arguments": arguments}
+                    })
+
+            if msg.get("images"):
+                ollama_msg["images"] = msg["images"]
+
+            converted.append(ollama_msg)
+        return converted
+
+    def _build_payload(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]],
+                       tool_choice: Optional[str], stream: bool, **kwargs) -> Dict[str, Any]:
+        """Build the /api/chat request body."""
+        options = {
+            "temperature": kwargs.get("temperature", 0.7),
+            "num_predict": kwargs.get("max_tokens", 1000)
+        }
+        num_ctx = kwargs.get("num_ctx", self.num_ctx)
+        if num_ctx:
+            options["num_ctx"] = num_ctx
+
+        payload = {
+            "model": kwargs.get("model", "llama2"),
+            "messages": self._convert_messages(messages),
+            "stream": stream,
+            "options": options,
+            "keep_alive": kwargs.get("keep_alive", self.keep_alive)
+        }
+
+        # Ollama takes the bare JSON schema of an OpenAI-style response_format
+        response_format = kwargs.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            payload["format"] = response_format["json_schema"]["schema"]
+        elif response_format.get("type") == "json_object":
+            payload["format"] = "json"
+
+        # Ollama has no tool_choice; "none" is honoured by not offering tools
+        if tools and tool_choice != "none":
+            payload["tools"] = tools
+
+        return payload
+
+    def _parse_tool_calls(self, message: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert Ollama tool calls to OpenAI format with stable call IDs."""
+        tool_calls = []
+        for index, tc in enumerate(message.get("tool_calls") or []):
+            function = tc.get("function", {})
+            arguments = function.get("arguments", {})
+            if not isinstance(arguments, str):
+                arguments = json.dumps(arguments, ensure_ascii=False)
+            tool_calls.append({
+                "id": make_call_id(index, function.get("name", ""), arguments),
+                "type": "function",
+                "function": {
+                    "name": function.get("name", ""),
+                    "arguments": arguments
+                }
+            })
+        return tool_calls
+
+    def _parse_response(self, data: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert an Ollama chat response into the client result format."""
+        message = data.get("message") or {}
+        result = {
+            "content": message.get("content", ""),
+            "done": data.get("done", True),
+            "model": data.get("model", payload["model"]),
+            "usage": {
+                "prompt_tokens": data.get("prompt_eval_count", 0),
+                "completion_tokens": data.get("eval_count", 0),
+                "total_tokens": data.get("prompt_eval_count", 0) + data.get("eval_count", 0)
+            }
+        }
+
+        tool_calls = self._parse_tool_calls(message)
+        if tool_calls:
+            result["tool_calls"] = tool_calls
+
+        return result
 
     def chat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
         """Send chat request to Ollama."""
@@ -17,52 +125,85 @@ class OllamaClient(LLMClient):
 
     def chat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
                        tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
-        """Send chat request to Ollama (tools not supported)."""
-        # Ollama doesn't support tools in the same way as OpenAI
-        # For now, we'll ignore tools and just do regular chat
-        if tools:
-            # Log warning that tools are not supported
-            pass
-
-        # Convert messages to Ollama format
-        # Ollama expects a single prompt, so we'll concatenate messages
-        prompt = ""
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            if role == "system":
-                prompt += f"System: {content}\n"
-            elif role == "user":
-                prompt += f"User: {content}\n"
-            elif role == "assistant":
-                prompt += f"Assistant: {content}\n"
+        """Send chat request with native tool support to Ollama."""
+        payload = self._build_payload(messages, tools, tool_choice, stream=False, **kwargs)
 
-        payload = {
-            "model": kwargs.get("model", "llama2"),
-            "prompt": prompt,
-            "stream": False
-        }
+        try:
+            data = self._post_json(self.endpoint, payload, timeout=60)
+            return self._parse_response(data, payload)
+        except requests.RequestException as e:
+            raise Exception(f"Ollama API request failed: {str(e)}")
+
+    async def achat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Send chat request to Ollama asynchronously."""
+        return await self.achat_with_tools(messages, tools=None, **kwargs)
+
+    async def achat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                               tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Send chat request with native tool support to Ollama asynchronously."""
+        payload = self._build_payload(messages, tools, tool_choice, stream=False, **kwargs)
 
         try:
-            response = requests.post(self.endpoint, json=payload, timeout=60)
-            response.raise_for_status()
-            data = response.json()
+            data = await self._apost_json(self.endpoint, payload, timeout=60)
+            return self._parse_response(data, payload)
+        except httpx.HTTPError as e:
+            raise Exception(f"Ollama API request failed: {str(e)}")
 
-            return {
-                "content": data.get("response", ""),
-                "done": data.get("done", True),
-                "model": data.get("model", payload["model"])
-            }
+    def chat_stream(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                    tool_choice: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """Stream chat content from Ollama's NDJSON response."""
+        payload = self._build_payload(messages, tools, tool_choice, stream=True, **kwargs)
+
+        try:
+            with self._open_stream(self.endpoint, payload, timeout=60) as response:
+                for chunk in iter_ndjson(response):
+                    if chunk.get("error"):
+                        raise Exception(f"Ollama API request failed: {chunk['error']}")
+                    content = (chunk.get("message") or {}).get("content")
+                    if content:
+                        yield content
+                    if chunk.get("done"):
+                        return
         except requests.RequestException as e:
             raise Exception(f"Ollama API request failed: {str(e)}")
 
+    def _probe_capabilities(self, model: str) -> Dict[str, Any]:
+        """Read capabilities and the context window from /api/show."""
+        response = self.session.post(f"{self.base_url}:{self.port}/api/show", json={"model": model},
+                                     timeout=(LLM_CONNECT_TIMEOUT, LLM_PROBE_TIMEOUT))
+        response.raise_for_status()
+        info = response.json()
+
+        capabilities = info.get("capabilities")
+        context_length = self.num_ctx or next(
+            (value for key, value in (info.get("model_info") or {}).items() if key.endswith(".context_length")), None
+        )
+        return {
+            # Servers too old to report capabilities are left to the tool prompt
+            "native_tools": "tools" in (capabilities or []),
+            # Structured outputs predate capability reporting
+            "json_schema": capabilities is not None,
+            "context_length": context_length
+        }
+
     def models(self) -> List[str]:
         """Get available models from Ollama."""
         try:
-            response = requests.get(f"{self.base_url}:{self.port}/api/tags", timeout=10)
+            response = self.session.get(f"{self.base_url}:{self.port}/api/tags", timeout=10)
             response.raise_for_status()
             data = response.json()
             return [model["name"] for model in data.get("models", [])]
         except requests.RequestException:
             # Fallback models
-            return ["llama2", "codellama", "mistral"]
\ No newline at end of file
+            return ["llama2", "codellama", "mistral"]
+
+    async def amodels(self) -> List[str]:
+        """Get available models from Ollama asynchronously."""
+        try:
+            response = await self._get_async_client().get(f"{self.base_url}:{self.port}/api/tags", timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            return [model["name"] for model in data.get("models", [])]
+        except httpx.HTTPError:
+            # Fallback models
+            return ["llama2", "codellama", "mistral"]
@@ -1,35 +1,38 @@
+import httpx
 import requests
-from typing import List, Dict, Any, Optional
-from ..llm_client import LLMClient
+from typing import List, Dict, Any, Optional, Iterator
+from .base import HTTPLLMClient, iter_sse_events
+from config.constants import LLM_POOL_SIZE
 
 
-class OpenAILikeClient(LLMClient):
+class OpenAILikeClient(HTTPLLMClient):
     """Client for OpenAI-compatible APIs (OpenAI, LM Studio, etc.)."""
 
-    def __init__(self, base_url: str, port: int, api_key: Optional[str] = None):
-        self.base_url = base_url.rstrip('/')
-        self.port = port
+    def __init__(self, base_url: str, port: int, api_key: Optional[str] = None,
+                 pool_size: int = LLM_POOL_SIZE):
+        super().__init__(base_url, port, pool_size)
         self.api_key = api_key
         self.endpoint = f"{self.base_url}:{self.port}/v1/chat/completions"
 
-    def chat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
-        """Send chat completion request."""
-        return self.chat_with_tools(messages, tools=None, **kwargs)
-
-    def chat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
-                       tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
-        """Send chat completion request with tool support."""
+    def _headers(self) -> Dict[str, str]:
+        """Build request headers."""
         headers = {"Content-Type": "application/json"}
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
 
+    def _build_payload(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]],
+                       tool_choice: Optional[str], stream: bool, **kwargs) -> Dict[str, Any]:
+        """Build the chat completion request body."""
         payload = {
             "messages": messages,
             "model": kwargs.get("model", "gpt-3.5-turbo"),
             "temperature": kwargs.get("temperature", 0.7),
             "max_tokens": kwargs.get("max_tokens", 1000),
-            "stream": False
+            "stream": stream
         }
+        if kwargs.get("response_format"):
+            payload["response_format"] = kwargs["response_format"]
 
         # Add tools if provided
         if tools:
@@ -37,33 +40,110 @@ class OpenAILikeClient(LLMClient):
             if tool_choice:
                 payload["tool_choice"] = tool_choice
 
+        return payload
+
+    def chat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Send chat completion request."""
+        return self.chat_with_tools(messages, tools=None, **kwargs)
+
+    def chat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                       tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Send chat completion request with tool support."""
+        payload = self._build_payload(messages, tools, tool_choice, stream=False, **kwargs)
+
         try:
-            response = requests.post(self.endpoint, json=payload, headers=headers, timeout=120)
-            response.raise_for_status()
-            data = response.json()
+            data = self._post_json(self.endpoint, payload, headers=self._headers(), timeout=120)
+            return self._parse_response(data, payload)
+        except requests.RequestException as e:
+            raise Exception(f"API request failed: {str(e)}")
 
-            result = {
-                "content": data["choices"][0]["message"]["content"],
-                "usage": data.get("usage", {}),
-                "model": data.get("model", payload["model"])
-            }
+    async def achat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Send chat completion request asynchronously."""
+        return await self.achat_with_tools(messages, tools=None, **kwargs)
 
-            # Include tool calls if present
-            message = data["choices"][0]["message"]
-            if "tool_calls" in message:
-                result["tool_calls"] = message["tool_calls"]
+    async def achat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                               tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Send chat completion request with tool support asynchronously."""
+        payload = self._build_payload(messages, tools, tool_choice, stream=False, **kwargs)
 
-            return result
+        try:
+            data = await self._apost_json(self.endpoint, payload, headers=self._headers(), timeout=120)
+            return self._parse_response(data, payload)
+        except httpx.HTTPError as e:
+            raise Exception(f"API request failed: {str(e)}")
+
+    def _parse_response(self, data: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a chat completion response into the client result format."""
+        result = {
+            "content": data["choices"][0]["message"]["content"],
+            "usage": data.get("usage", {}),
+            "model": data.get("model", payload["model"])
+        }
+
+        # Include tool calls if present
+        message = data["choices"][0]["message"]
+        if "tool_calls" in message:
+            result["tool_calls"] = message["tool_calls"]
+
+        return result
+
+    def chat_stream(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                    tool_choice: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """Stream chat completion content from the SSE response."""
+        payload = self._build_payload(messages, tools, tool_choice, stream=True, **kwargs)
+
+        try:
+            with self._open_stream(self.endpoint, payload, headers=self._headers(), timeout=120) as response:
+                for event in iter_sse_events(response):
+                    choices = event.get("choices") or []
+                    if not choices:
+                        continue
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if delta:
+                        yield delta
         except requests.RequestException as e:
             raise Exception(f"API request failed: {str(e)}")
 
+    def _probe_capabilities(self, model: str) -> Dict[str, Any]:
+        """Probe optional features with small requests and read the context window if listed."""
+        capabilities = self._probe_openai_features(self.endpoint, model, self._headers())
+        capabilities["context_length"] = self._context_length(model)
+        return capabilities
+
+    def _context_length(self, model: str) -> Optional[int]:
+        """Read a model's context window from /v1/models, for servers that report it."""
+        try:
+            response = self.session.get(f"{self.base_url}:{self.port}/v1/models", headers=self._headers(), timeout=10)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError):
+            return None
+        for entry in data.get("data", []):
+            if entry.get("id") == model:
+                # vLLM reports max_model_len, others context_length or context_window
+                for key in ("context_length", "max_model_len", "context_window"):
+                    if entry.get(key):
+                        return int(entry[key])
+        return None
+
     def models(self) -> List[str]:
         """Get available models."""
         try:
-            response = requests.get(f"{self.base_url}:{self.port}/v1/models", timeout=10)
+            response = self.session.get(f"{self.base_url}:{self.port}/v1/models", timeout=10)
             response.raise_for_status()
             data = response.json()
             return [model["id"] for model in data.get("data", [])]
         except requests.RequestException:
             # Fallback to common models if endpoint not available
-            return ["gpt-3.5-turbo", "gpt-4", "gemma-2b"]
\ No newline at end of file
+            return ["gpt-3.5-turbo", "gpt-4", "gemma-2b"]
+
+    async def amodels(self) -> List[str]:
+        """Get available models asynchronously."""
+        try:
+            response = await self._get_async_client().get(f"{self.base_url}:{self.port}/v1/models", timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            return [model["id"] for model in data.get("data", [])]
+        except httpx.HTTPError:
+            # Fallback to common models if endpoint not available
+            return ["gpt-3.5-turbo", "gpt-4", "gemma-2b"]
@@ -0,0 +1,205 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator, Callable, TypeVar
+from ..llm_client import LLMClient, merge_capabilities
+from .resilience import BackendUnavailableError, CircuitBreaker, is_transient
+from utils.logging import get_logger
+from config.constants import LLM_POOL_EJECTION_TIME
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """Check whether an error means the backend, not the request, is at fault.
+
+    Adapters re-raise transport errors as plain exceptions, so the original
+    error is looked up through the exception chain.
+    """
+    while error is not None:
+        if isinstance(error, BackendUnavailableError) or (isinstance(error, Exception) and is_transient(error)):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class PoolMember:
+    """A backend in an LLM pool with its routing state."""
+
+    def __init__(self, client: LLMClient, weight: float = 1.0):
+        self.client = client
+        self.weight = max(weight, 0.01)
+        self.endpoint = f"{getattr(client, 'base_url', '')}:{getattr(client, 'port', '')}"
+        self.in_flight = 0
+        self.ejected_until = 0.0
+        self.failures = 0
+
+    @property
+    def breaker(self) -> Optional[CircuitBreaker]:
+        return getattr(self.client, "breaker", None)
+
+    def is_healthy(self, now: float) -> bool:
+        """Check whether the member may receive traffic."""
+        if now < self.ejected_until:
+            return False
+        breaker = self.breaker
+        if breaker is None:
+            return True
+        # An open breaker past its recovery timeout is eligible for the half-open probe
+        state = breaker.snapshot()
+        return state["state"] != CircuitBreaker.OPEN or state["retry_in"] <= 0
+
+    def load(self) -> float:
+        """Weighted outstanding requests, counting the one about to be sent."""
+        return (self.in_flight + 1) / self.weight
+
+
+class PooledLLMClient(LLMClient):
+    """LLMClient that spreads requests over several backends.
+
+    Each request goes to the healthy member with the fewest weighted
+    in-flight requests. Members that fail with backend errors are ejected
+    for a cool-down period and the request is retried on another member.
+    """
+
+    def __init__(self, members: List[PoolMember], ejection_time: float = LLM_POOL_EJECTION_TIME):
+        if not members:
+            raise ValueError("PooledLLMClient needs at least one member")
+        self.members = members
+        self.ejection_time = ejection_time
+        self._lock = threading.Lock()
+
+    def _acquire(self, exclude: List[PoolMember]) -> PoolMember:
+        """Pick the least loaded healthy member and count the request against it."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [m for m in self.members if m not in exclude]
+            healthy = [m for m in candidates if m.is_healthy(now)]
+            # With nothing healthy, let the soonest-to-recover member's breaker decide
+            pool = healthy or sorted(candidates, key=lambda m: m.ejected_until)[:1]
+            if not pool:
+                raise BackendUnavailableError("pool", self.ejection_time)
+            member = min(pool, key=lambda m: m.load())
+            member.in_flight += 1
+            return member
+
+    def _release(self, member: PoolMember, error: Optional[BaseException] = None):
+        """Return a member after a request, ejecting it on backend failure."""
+        with self._lock:
+            member.in_flight -= 1
+            if error is None:
+                member.failures = 0
+            elif is_backend_failure(error):
+                member.failures += 1
+                member.ejected_until = time.monotonic() + self.ejection_time
+                logger.warning(f"Ejecting LLM backend {member.endpoint} for {self.ejection_time}s: {error}")
+
+    def _route(self, call: Callable[[LLMClient], T]) -> T:
+        """Run a call on the best member, failing over on backend errors."""
+        tried: List[PoolMember] = []
+        while True:
+            member = self._acquire(tried)
+            tried.append(member)
+            try:
+                result = call(member.client)
+            except Exception as e:
+                self._release(member, e)
+                if is_backend_failure(e) and len(tried) < len(self.members):
+                    continue
+                raise
+            self._release(member)
+            return result
+
+    async def _aroute(self, call: Callable[[LLMClient], Any]) -> Any:
+        """Async counterpart of _route()."""
+        tried: List[PoolMember] = []
+        while True:
+            member = self._acquire(tried)
+            tried.append(member)
+            try:
+                result = await call(member.client)
+            except Exception as e:
+                self._release(member, e)
+                if is_backend_failure(e) and len(tried) < len(self.members):
+                    continue
+                raise
+            except BaseException:
+                self._release(member)
+                raise
+            self._release(member)
+            return result
+
+    @contextmanager
+    def _lease(self) -> Iterator[PoolMember]:
+        """Hold a member for the duration of a streamed response."""
+        member = self._acquire([])
+        try:
+            yield member
+        except Exception as e:
+            self._release(member, e)
+            raise
+        except BaseException:
+            self._release(member)
+            raise
+        else:
+            self._release(member)
+
+    def chat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Send a chat request to the least loaded backend."""
+        return self._route(lambda client: client.chat(messages, **kwargs))
+
+    def chat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                       tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Send a chat request with tools to the least loaded backend."""
+        return self._route(lambda client: client.chat_with_tools(messages, tools=tools,
+                                                                 tool_choice=tool_choice, **kwargs))
+
+    async def achat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Async chat request to the least loaded backend."""
+        return await self._aroute(lambda client: client.achat(messages, **kwargs))
+
+    async def achat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                               tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Async chat request with tools to the least loaded backend."""
+        return await self._aroute(lambda client: client.achat_with_tools(messages, tools=tools,
+                                                                         tool_choice=tool_choice, **kwargs))
+
+    def chat_stream(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                    tool_choice: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """Stream a chat response from the least loaded backend."""
+        with self._lease() as member:
+            yield from member.client.chat_stream(messages, tools=tools, tool_choice=tool_choice, **kwargs)
+
+    def models(self) -> List[str]:
+        """Get the models available across all members."""
+        models: List[str] = []
+        for member in self.members:
+            for model in member.client.models():
+                if model not in models:
+                    models.append(model)
+        return models
+
+    def capabilities(self, model: str) -> Dict[str, Any]:
+        """Get the capabilities every member supports, since any member may serve a request."""
+        return merge_capabilities([member.client.capabilities(model) for member in self.members])
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Get routing state per member for display."""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                "endpoint": m.endpoint,
+                "weight": m.weight,
+                "in_flight": m.in_flight,
+                "healthy": m.is_healthy(now),
+                "failures": m.failures
+            } for m in self.members]
+
+    def close(self):
+        """Close connection pools of all members."""
+        for member in self.members:
+            close = getattr(member.client, "close", None)
+            if close:
+                close()
@@ -0,0 +1,225 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Any, Callable, Awaitable, TypeVar
+import httpx
+import requests
+from utils.logging import get_logger
+from config.constants import (
+    LLM_RETRY_ATTEMPTS, LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY,
+    LLM_BREAKER_FAILURE_THRESHOLD, LLM_BREAKER_RECOVERY_TIMEOUT
+)
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses that indicate an overloaded or restarting backend
+TRANSIENT_STATUS_CODES = {408, 429, 502, 503, 504}
+
+
+class BackendUnavailableError(Exception):
+    """Raised without contacting the backend while its circuit breaker is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+        super().__init__(f"LLM backend {endpoint} is unavailable, retrying in {retry_in:.0f}s")
+
+
+def is_transient(error: Exception) -> bool:
+    """Check whether an error is worth retrying and counts against the backend.
+
+    Read timeouts are not: the backend accepted the request and is most
+    likely still generating a long answer.
+    """
+    if is_read_timeout(error):
+        return False
+    if isinstance(error, (requests.ConnectionError, requests.ConnectTimeout,
+                          httpx.ConnectTimeout, httpx.NetworkError)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in TRANSIENT_STATUS_CODES
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in TRANSIENT_STATUS_CODES
+    return False
+
+
+def is_read_timeout(error: Exception) -> bool:
+    """Check whether a request timed out waiting for the response."""
+    return isinstance(error, (requests.ReadTimeout, httpx.ReadTimeout))
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for transient errors."""
+
+    def __init__(self, max_attempts: int = LLM_RETRY_ATTEMPTS, base_delay: float = LLM_RETRY_BASE_DELAY,
+                 max_delay: float = LLM_RETRY_MAX_DELAY):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Get the "full jitter" sleep before retry number ``attempt`` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Per-endpoint circuit breaker with half-open recovery probing.
+
+    closed: requests flow; consecutive transient failures are counted.
+    open: requests fail fast until ``recovery_timeout`` has elapsed.
+    half_open: a single probe request is let through; success closes the
+    breaker, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, endpoint: str, failure_threshold: int = LLM_BREAKER_FAILURE_THRESHOLD,
+                 recovery_timeout: float = LLM_BREAKER_RECOVERY_TIMEOUT):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error = ""
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """Admit a request or raise BackendUnavailableError."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+
+            elapsed = time.monotonic() - self.opened_at
+            if self.state == self.OPEN and elapsed >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(f"Circuit for {self.endpoint} half-open, probing backend")
+
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+
+            raise BackendUnavailableError(self.endpoint, max(0.0, self.recovery_timeout - elapsed))
+
+    def record_success(self):
+        """Record a request that reached the backend."""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit for {self.endpoint} closed, backend recovered")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error: Exception):
+        """Record a transient failure, opening the breaker when the threshold is hit."""
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit for {self.endpoint} opened after {self.failures} failures: {error}")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def abandon(self):
+        """Release a half-open probe slot for a request that was cancelled."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the breaker state for display."""
+        with self._lock:
+            retry_in = 0.0
+            if self.state == self.OPEN:
+                retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+            return {
+                "endpoint": self.endpoint,
+                "state": self.state,
+                "failures": self.failures,
+                "retry_in": retry_in,
+                "last_error": self.last_error
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """Get the process-wide circuit breaker for an endpoint."""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(endpoint)
+            _breakers[endpoint] = breaker
+        return breaker
+
+
+def get_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Get snapshots of all circuit breakers keyed by endpoint."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.endpoint: breaker.snapshot() for breaker in breakers}
+
+
+def call_with_resilience(breaker: CircuitBreaker, retry_policy: RetryPolicy, func: Callable[[], T]) -> T:
+    """Run a request through the circuit breaker, retrying transient errors."""
+    for attempt in range(retry_policy.max_attempts):
+        breaker.before_request()
+        try:
+            result = func()
+        except Exception as e:
+            if is_read_timeout(e):
+                # A slow generation, not a failing backend: fail once, neither retried nor counted
+                breaker.abandon()
+                raise
+            if not is_transient(e):
+                # The backend answered; the request itself was bad
+                breaker.record_success()
+                raise
+            breaker.record_failure(e)
+            if attempt + 1 >= retry_policy.max_attempts:
+                raise
+            delay = retry_policy.delay(attempt)
+            logger.warning(f"Transient error from {breaker.endpoint}, retrying in {delay:.2f}s: {e}")
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+async def acall_with_resilience(breaker: CircuitBreaker, retry_policy: RetryPolicy,
+                                func: Callable[[], Awaitable[T]]) -> T:
+    """Async counterpart of call_with_resilience()."""
+    for attempt in range(retry_policy.max_attempts):
+        breaker.before_request()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            breaker.abandon()
+            raise
+        except Exception as e:
+            if is_read_timeout(e):
+                # A slow generation, not a failing backend: fail once, neither retried nor counted
+                breaker.abandon()
+                raise
+            if not is_transient(e):
+                breaker.record_success()
+                raise
+            breaker.record_failure(e)
+            if attempt + 1 >= retry_policy.max_attempts:
+                raise
+            delay = retry_policy.delay(attempt)
+            logger.warning(f"Transient error from {breaker.endpoint}, retrying in {delay:.2f}s: {e}")
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
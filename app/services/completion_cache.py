@@ -0,0 +1,282 @@
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator
+from .llm_client import LLMClient
+from utils.hashing import canonical_hash
+from utils.logging import get_logger
+from config.constants import LLM_CACHE_DIR, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_DISK_ENTRIES
+
+# Writes between scans of the disk tier for expired and surplus entries
+_PRUNE_INTERVAL = 100
+
+logger = get_logger(__name__)
+
+
+class CompletionCache:
+    """Exact-match completion cache with an in-memory LRU in front of an on-disk store.
+
+    The disk tier is pruned on startup and every few writes: expired entries
+    are deleted, then the least recently written ones beyond max_disk_entries.
+    """
+
+    def __init__(self, cache_dir: str = LLM_CACHE_DIR, ttl: int = LLM_CACHE_TTL,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES, max_disk_entries: int = LLM_CACHE_MAX_DISK_ENTRIES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        self._writes_since_prune = 0
+        self._stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "pruned": 0}
+        self.prune_disk()
+
+    @staticmethod
+    def make_key(namespace: str, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]],
+                 tool_choice: Optional[str], **kwargs) -> str:
+        """Build a canonical cache key for a completion request."""
+        return canonical_hash({
+            "namespace": namespace,
+            "messages": messages,
+            "model": kwargs.get("model"),
+            "tools": tools,
+            "tool_choice": tool_choice,
+            "temperature": kwargs.get("temperature"),
+            "max_tokens": kwargs.get("max_tokens"),
+            "response_format": kwargs.get("response_format")
+        })
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached completion, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry["expires_at"] > now:
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return copy.deepcopy(entry["value"])
+                del self._memory[key]
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is not None and entry["expires_at"] > now:
+                self._remember(key, entry)
+                self._stats["hits"] += 1
+                self._stats["disk_hits"] += 1
+                return copy.deepcopy(entry["value"])
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a completion in both tiers."""
+        entry = {"expires_at": time.time() + self.ttl, "value": copy.deepcopy(value)}
+        with self._lock:
+            self._remember(key, entry)
+            self._stats["writes"] += 1
+            self._writes_since_prune += 1
+            prune = self._writes_since_prune >= _PRUNE_INTERVAL
+            if prune:
+                self._writes_since_prune = 0
+        self._write_disk(key, entry)
+        if prune:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """Delete expired disk entries, then the oldest ones beyond max_disk_entries."""
+        # One scan at a time; a concurrent caller skips instead of waiting
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            entries = []
+            for path in self.cache_dir.glob("*/*.json"):
+                try:
+                    entries.append((path.stat().st_mtime, path))
+                except OSError:
+                    continue
+
+            # Files are written once with a fixed TTL, so age is enough to tell expiry
+            expired_before = time.time() - self.ttl
+            entries.sort()
+            surplus = max(0, len(entries) - self.max_disk_entries)
+            removed = 0
+            for index, (mtime, path) in enumerate(entries):
+                if mtime > expired_before and index >= surplus:
+                    break
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    continue
+        finally:
+            self._prune_lock.release()
+
+        if removed:
+            logger.info(f"Pruned {removed} completion cache files")
+            with self._lock:
+                self._stats["pruned"] += removed
+
+    def clear(self):
+        """Remove all cached completions."""
+        with self._lock:
+            self._memory.clear()
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current memory tier size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if entry.get("expires_at", 0) <= time.time():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def _write_disk(self, key: str, entry: Dict[str, Any]):
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            logger.warning(f"Failed to write completion cache entry: {e}")
+
+
+class CachedLLMClient(LLMClient):
+    """LLMClient decorator that serves repeated completions from a CompletionCache.
+
+    Requests are cached when they are deterministic (temperature 0) or the
+    caller passes ``cache=True``.
+    """
+
+    def __init__(self, client: LLMClient, cache: CompletionCache, namespace: Optional[str] = None):
+        self.client = client
+        self.cache = cache
+        # Keeps entries of different backends apart; pools must pass their flavor and endpoints
+        self.namespace = namespace or f"{type(client).__name__}:{getattr(client, 'base_url', '')}:{getattr(client, 'port', '')}"
+
+    def _cache_key(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]],
+                   tool_choice: Optional[str], kwargs: Dict[str, Any]) -> Optional[str]:
+        """Get the cache key if this request is cacheable, popping the opt-in flag."""
+        opt_in = kwargs.pop("cache", False)
+        if not opt_in and kwargs.get("temperature", 0.7) != 0:
+            return None
+        return self.cache.make_key(self.namespace, messages, tools, tool_choice, **kwargs)
+
+    def chat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Send a chat request, serving it from cache when possible."""
+        return self.chat_with_tools(messages, tools=None, **kwargs)
+
+    def chat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                       tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Send a chat request with tools, serving it from cache when possible."""
+        key = self._cache_key(messages, tools, tool_choice, kwargs)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return dict(cached, cached=True)
+
+        result = self.client.chat_with_tools(messages, tools=tools, tool_choice=tool_choice, **kwargs)
+        if key is not None:
+            self.cache.set(key, result)
+        return result
+
+    async def achat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Async chat request, served from cache when possible."""
+        return await self.achat_with_tools(messages, tools=None, **kwargs)
+
+    async def achat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                               tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Async chat request with tools, served from cache when possible."""
+        key = self._cache_key(messages, tools, tool_choice, kwargs)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return dict(cached, cached=True)
+
+        result = await self.client.achat_with_tools(messages, tools=tools, tool_choice=tool_choice, **kwargs)
+        if key is not None:
+            self.cache.set(key, result)
+        return result
+
+    def chat_stream(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                    tool_choice: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """Stream a chat response, replaying cached content on a hit."""
+        key = self._cache_key(messages, tools, tool_choice, kwargs)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached.get("content") or ""
+                return
+
+        parts = []
+        for chunk in self.client.chat_stream(messages, tools=tools, tool_choice=tool_choice, **kwargs):
+            parts.append(chunk)
+            yield chunk
+
+        if key is not None:
+            self.cache.set(key, {"content": "".join(parts), "model": kwargs.get("model")})
+
+    def capabilities(self, model: str) -> Dict[str, Any]:
+        """Get capabilities from the wrapped client."""
+        return self.client.capabilities(model)
+
+    def models(self) -> List[str]:
+        """Get available models from the wrapped client."""
+        return self.client.models()
+
+    async def amodels(self) -> List[str]:
+        """Get available models from the wrapped client asynchronously."""
+        return await self.client.amodels()
+
+
+_completion_cache: Optional[CompletionCache] = None
+_completion_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> CompletionCache:
+    """Get the process-wide completion cache."""
+    global _completion_cache
+    with _completion_cache_lock:
+        if _completion_cache is None:
+            _completion_cache = CompletionCache()
+        return _completion_cache
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional, TypeVar
+from utils.logging import get_logger
+
+T = TypeVar("T")
+
+logger = get_logger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the process-wide background event loop, starting it on first use.
+
+    The loop runs forever in a daemon thread, so async clients and their
+    connection pools bound to it outlive any single Streamlit rerun.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_run_loop, args=(loop,), name="async-io", daemon=True)
+            thread.start()
+            _loop = loop
+            logger.info("Started background event loop")
+        return _loop
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def submit_coroutine(coro: Awaitable[T]) -> "Future[T]":
+    """Schedule a coroutine on the background loop without waiting for it.
+
+    Returns a concurrent.futures.Future; cancelling it cancels the task.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+def run_coroutine(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Run a coroutine on the background loop from a synchronous thread and wait for its result.
+
+    Raises:
+        RuntimeError: If called from the background loop itself, which would deadlock
+        concurrent.futures.TimeoutError: If the result is not ready within timeout
+    """
+    if _running_loop() is get_event_loop():
+        raise RuntimeError("run_coroutine() cannot be called from the background event loop")
+    future = submit_coroutine(coro)
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def close_on_loop(client: Any, loop: Optional[asyncio.AbstractEventLoop]):
+    """Close an async HTTP client from any thread on the loop its connections belong to.
+
+    Nothing is done if that loop has stopped; its connections cannot be
+    closed cleanly anymore and are released with the client.
+    """
+    if loop is None or loop.is_closed() or not loop.is_running():
+        logger.debug("Event loop of an async client is gone, dropping the client")
+        return
+    if _running_loop() is loop:
+        loop.create_task(client.aclose())
+    else:
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+
+def _running_loop() -> Any:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
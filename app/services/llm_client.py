@@ -1,5 +1,25 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
+
+# What a backend is assumed to support until probed
+DEFAULT_CAPABILITIES: Dict[str, Any] = {
+    "native_tools": False,
+    "json_schema": False,
+    "context_length": None
+}
+
+
+def merge_capabilities(capabilities: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the capabilities of interchangeable backends into what all of them support."""
+    if not capabilities:
+        return dict(DEFAULT_CAPABILITIES)
+    lengths = [c["context_length"] for c in capabilities if c.get("context_length")]
+    return {
+        "native_tools": all(c.get("native_tools") for c in capabilities),
+        "json_schema": all(c.get("json_schema") for c in capabilities),
+        "context_length": min(lengths) if lengths else None
+    }
 
 
 class LLMClient(ABC):
@@ -34,6 +54,22 @@ class LLMClient(ABC):
         """
         pass
 
+    @abstractmethod
+    def chat_stream(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                    tool_choice: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """Send a chat request and stream the response content as it is generated.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content' keys
+            tools: List of available tools
+            tool_choice: Tool choice strategy ("none", "auto", or specific tool)
+            **kwargs: Additional parameters like temperature, max_tokens, etc.
+
+        Yields:
+            Content fragments in generation order
+        """
+        pass
+
     @abstractmethod
     def models(self) -> List[str]:
         """Get list of available models.
@@ -41,4 +77,33 @@ class LLMClient(ABC):
         Returns:
             List of model names
         """
-        pass
\ No newline at end of file
+        pass
+
+    def capabilities(self, model: str) -> Dict[str, Any]:
+        """Get what the backend supports for a model.
+
+        Args:
+            model: Model name
+
+        Returns:
+            Dict with 'native_tools' and 'json_schema' flags and 'context_length'
+            (None when unknown); the default assumes no optional features
+        """
+        return dict(DEFAULT_CAPABILITIES)
+
+    async def achat(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Async counterpart of chat().
+
+        Adapters with a native async transport override this; the default
+        runs the sync call in a worker thread.
+        """
+        return await asyncio.to_thread(self.chat, messages, **kwargs)
+
+    async def achat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                               tool_choice: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Async counterpart of chat_with_tools()."""
+        return await asyncio.to_thread(self.chat_with_tools, messages, tools, tool_choice, **kwargs)
+
+    async def amodels(self) -> List[str]:
+        """Async counterpart of models()."""
+        return await asyncio.to_thread(self.models)
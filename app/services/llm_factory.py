@@ -1,27 +1,138 @@
-from typing import Optional
+import threading
+from typing import Optional, Dict, Tuple, List
 from .adapters.openai_like import OpenAILikeClient
 from .adapters.ollama import OllamaClient
 from .adapters.lmstudio import LMStudioClient
+from .adapters.pool import PooledLLMClient, PoolMember
+from .adapters.hedging import HedgedLLMClient
 from .llm_client import LLMClient
+from .completion_cache import CachedLLMClient, get_completion_cache
+from config.constants import LLM_POOL_SIZE
 
+# Long-lived clients keyed by (api_flavor, base_url, port, api_key)
+_clients: Dict[Tuple[str, str, int, Optional[str]], LLMClient] = {}
+_clients_lock = threading.Lock()
 
-def get_llm_client(api_flavor: str, base_url: str, port: int, api_key: Optional[str] = None) -> LLMClient:
-    """Factory function to create the appropriate LLM client.
+# Pools and hedged clients keyed by (api_flavor, endpoints, api_key, hedge)
+_pools: Dict[Tuple[str, Tuple[Tuple[str, int, float], ...], Optional[str], bool], LLMClient] = {}
+
+
+def parse_endpoints(spec: str) -> List[Tuple[str, int, float]]:
+    """Parse an LLM_ENDPOINTS value into (base_url, port, weight) tuples.
+
+    Entries are comma-separated ``base_url:port`` with an optional
+    ``*weight`` suffix, e.g. ``http://10.0.0.5:1234*2,http://10.0.0.6:1234``.
+    """
+    endpoints = []
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        weight = 1.0
+        if '*' in entry:
+            entry, weight_str = entry.rsplit('*', 1)
+            weight = float(weight_str)
+        base_url, port = entry.rstrip('/').rsplit(':', 1)
+        endpoints.append((base_url, int(port), weight))
+    return endpoints
+
+
+def _create_llm_client(api_flavor: str, base_url: str, port: int, api_key: Optional[str],
+                       pool_size: int) -> LLMClient:
+    """Instantiate a new adapter for the given API flavor."""
+    if api_flavor == "openai-compatible":
+        return OpenAILikeClient(base_url, port, api_key, pool_size=pool_size)
+    elif api_flavor == "ollama":
+        return OllamaClient(base_url, port, pool_size=pool_size)
+    elif api_flavor == "lmstudio":
+        return LMStudioClient(base_url, port, pool_size=pool_size)
+    else:
+        raise ValueError(f"Unsupported API flavor: {api_flavor}")
+
+
+def get_llm_client(api_flavor: str, base_url: str, port: int, api_key: Optional[str] = None,
+                   pool_size: int = LLM_POOL_SIZE, cache_mode: str = "off",
+                   endpoints: Optional[List[Tuple[str, int, float]]] = None, hedge: bool = False) -> LLMClient:
+    """Factory function returning the shared LLM client for an endpoint.
+
+    Clients are cached per process so their keep-alive connection pools are
+    reused across turns, reruns and sessions.
 
     Args:
         api_flavor: Type of API ('openai-compatible', 'ollama', 'lmstudio')
         base_url: Base URL for the API
         port: Port number
         api_key: Optional API key for authenticated APIs
+        pool_size: Connection pool size, applied when the client is first created
+        cache_mode: Completion cache mode ('off', 'deterministic', 'always'); any
+            mode other than 'off' wraps the client in a CachedLLMClient
+        endpoints: Optional (base_url, port, weight) backends; when given, a
+            PooledLLMClient routing over them is returned instead of the
+            single base_url/port client
+        hedge: With two or more endpoints, return a HedgedLLMClient that
+            re-sends slow requests to a second replica instead of a pool
 
     Returns:
         Configured LLMClient instance
     """
-    if api_flavor == "openai-compatible":
-        return OpenAILikeClient(base_url, port, api_key)
-    elif api_flavor == "ollama":
-        return OllamaClient(base_url, port)
-    elif api_flavor == "lmstudio":
-        return LMStudioClient(base_url, port)
+    if endpoints:
+        client = _get_pooled_client(api_flavor, endpoints, api_key, pool_size, hedge)
     else:
-        raise ValueError(f"Unsupported API flavor: {api_flavor}")
\ No newline at end of file
+        client = _get_endpoint_client(api_flavor, base_url, port, api_key, pool_size)
+
+    if cache_mode != "off":
+        # Replies depend on the backends, not on how requests are spread over them
+        backends = [(url, port) for url, port, _ in endpoints] if endpoints else [(base_url, port)]
+        namespace = f"{api_flavor}:" + ",".join(sorted(f"{url.rstrip('/')}:{int(port)}" for url, port in backends))
+        return CachedLLMClient(client, get_completion_cache(), namespace)
+    return client
+
+
+def _get_endpoint_client(api_flavor: str, base_url: str, port: int, api_key: Optional[str],
+                         pool_size: int) -> LLMClient:
+    """Get or create the cached adapter for a single endpoint."""
+    key = (api_flavor, base_url.rstrip('/'), int(port), api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _create_llm_client(api_flavor, base_url, int(port), api_key, pool_size)
+            _clients[key] = client
+        return client
+
+
+def _get_pooled_client(api_flavor: str, endpoints: List[Tuple[str, int, float]], api_key: Optional[str],
+                       pool_size: int, hedge: bool = False) -> LLMClient:
+    """Get or create the cached pool (or hedged client) over several endpoints."""
+    hedge = hedge and len(endpoints) >= 2
+    key = (api_flavor, tuple((url.rstrip('/'), int(port), float(weight)) for url, port, weight in endpoints),
+           api_key, hedge)
+    with _clients_lock:
+        pool = _pools.get(key)
+    if pool is not None:
+        return pool
+
+    if hedge:
+        # Heavier-weighted endpoints are preferred as primaries when idle
+        ordered = sorted(endpoints, key=lambda e: -e[2])
+        pool = HedgedLLMClient([
+            _get_endpoint_client(api_flavor, url, port, api_key, pool_size) for url, port, _ in ordered
+        ])
+    else:
+        pool = PooledLLMClient([
+            PoolMember(_get_endpoint_client(api_flavor, url, port, api_key, pool_size), weight)
+            for url, port, weight in endpoints
+        ])
+    with _clients_lock:
+        return _pools.setdefault(key, pool)
+
+
+def invalidate_llm_clients():
+    """Drop all cached LLM clients so the next request builds them from the current config.
+
+    The dropped clients are not closed: requests still running on them
+    finish normally, and their connection pools are released once the
+    last reference goes away.
+    """
+    with _clients_lock:
+        _clients.clear()
+        _pools.clear()
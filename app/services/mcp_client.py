@@ -1,17 +1,150 @@
-import requests
+import asyncio
+import itertools
 import json
-from typing import Dict, Any, List
+import threading
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Callable, Iterator, AsyncIterator, Tuple, Union
+import httpx
+import requests
 from utils.logging import get_logger
-from config.constants import MCP_SERVER_URL
+from utils.hashing import canonical_hash
+from config.constants import MCP_SERVER_URL, MCP_TOOL_TIMEOUT, MCP_POOL_SIZE, MCP_TOOLS_CACHE_TTL, MCP_BATCH_CALLS
+from .single_flight import SingleFlight
+from .event_loop import close_on_loop
+from .tool_cache import get_tool_result_cache
+from .tool_prompt import tool_list_cache
+from .adapters.base import create_session
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 logger = get_logger(__name__)
 
+# Process-wide coalescing of identical in-flight JSON-RPC requests
+mcp_single_flight = SingleFlight()
+
+# Long-lived clients keyed by base URL
+_clients: Dict[str, "MCPHTTPClient"] = {}
+_clients_lock = threading.Lock()
+
+
+class MCPSessionExpired(Exception):
+    """The server no longer recognises the MCP session ID."""
+
+
+class MCPBatchRejected(Exception):
+    """The server does not accept JSON-RPC batches."""
+
+
+class SSEDecoder:
+    """Incremental decoder turning SSE lines into JSON-RPC messages.
+
+    Multi-line data fields are joined per the SSE spec; comments and the
+    event/id/retry fields are ignored.
+    """
+
+    def __init__(self):
+        self._data: List[str] = []
+
+    def feed(self, line: str) -> Optional[Any]:
+        """Feed one line; returns a message when the line completes an event."""
+        if line:
+            if line.startswith("data:"):
+                value = line[len("data:"):]
+                self._data.append(value[1:] if value.startswith(" ") else value)
+            return None
+        # A blank line dispatches the event
+        return self.finish()
+
+    def finish(self) -> Optional[Any]:
+        """Decode the pending event, if any."""
+        data, self._data = self._data, []
+        if not data:
+            return None
+        try:
+            return json.loads("\n".join(data))
+        except json.JSONDecodeError:
+            logger.warning("Skipping malformed SSE message from MCP server")
+            return None
+
+
+def iter_sse_messages(response) -> Iterator[Any]:
+    """Yield JSON-RPC messages from a streamable-HTTP SSE response as they arrive."""
+    # SSE is always UTF-8; requests assumes ISO-8859-1 for text/* without a charset
+    response.encoding = "utf-8"
+    decoder = SSEDecoder()
+    for line in response.iter_lines(decode_unicode=True):
+        message = decoder.feed(line)
+        if message is not None:
+            yield message
+    message = decoder.finish()
+    if message is not None:
+        yield message
+
+
+async def aiter_sse_messages(response: httpx.Response) -> AsyncIterator[Any]:
+    """Async counterpart of iter_sse_messages() for httpx streams."""
+    decoder = SSEDecoder()
+    async for line in response.aiter_lines():
+        message = decoder.feed(line)
+        if message is not None:
+            yield message
+    message = decoder.finish()
+    if message is not None:
+        yield message
+
+
+_INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {"name": "flow-ai-chat", "version": "1.0"}
+    }
+}
+
+
 class MCPHTTPClient:
-    """HTTP client for communicating with MCP server using JSON-RPC over HTTP."""
+    """HTTP client for communicating with MCP server using JSON-RPC over HTTP.
+
+    Use get_mcp_client() to share one instance, and with it one connection
+    pool and MCP session, per server across reruns and sessions.
 
-    def __init__(self, base_url: str = MCP_SERVER_URL):
+    The a-prefixed methods are asyncio-native counterparts sharing the same
+    session, catalog and caches. They use a pooled httpx client (HTTP/2
+    when h2 is installed) and are meant to run on the process-wide loop
+    from services.event_loop.
+    """
+
+    def __init__(self, base_url: str = MCP_SERVER_URL, pool_size: int = MCP_POOL_SIZE,
+                 tools_ttl: float = MCP_TOOLS_CACHE_TTL):
         self.base_url = base_url.rstrip('/')
         self.session_id: str = ""
+        self.pool_size = pool_size
+        self.http = create_session(pool_size)
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_lock = threading.Lock()
+        self._session_lock = threading.Lock()
+        self.tool_cache = get_tool_result_cache()
+        # Tool catalog, served stale while a background refresh runs
+        self.tools_ttl = tools_ttl
+        self._tools: Optional[List[Dict[str, Any]]] = None
+        self._tools_version = ""
+        self._tools_expires_at = 0.0
+        self._tools_refreshing = False
+        self._tools_lock = threading.Lock()
+        self._async_session_lock: Optional[asyncio.Lock] = None
+        # Request IDs are unique per client, so concurrent requests on the session never collide
+        self._request_ids = itertools.count(2)
+        # Servers on protocol revisions without batching reject them; remembered after the first try
+        self.batch_supported = MCP_BATCH_CALLS
 
     def _initialize_session(self):
         """Initialize session with MCP server"""
@@ -20,19 +153,9 @@ class MCPHTTPClient:
 
         try:
             # Initialize MCP session via POST
-            init_payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {},
-                    "clientInfo": {"name": "flow-ai-chat", "version": "1.0"}
-                }
-            }
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/mcp",
-                json=init_payload,
+                json=_INITIALIZE_REQUEST,
                 headers={
                     "Content-Type": "application/json",
                     "Accept": "application/json, text/event-stream"
@@ -52,85 +175,658 @@ class MCPHTTPClient:
         except Exception as e:
             logger.warning(f"Failed to initialize MCP session: {e}")
 
-    def _jsonrpc_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Send JSON-RPC request to MCP server"""
-        if not self.session_id:
-            self._initialize_session()
+    def _reset_session(self, session_id: str):
+        """Forget an expired session ID so the next request re-initializes."""
+        with self._session_lock:
+            if self.session_id == session_id:
+                logger.info(f"MCP session {session_id} expired, re-initializing")
+                self.session_id = ""
+
+    def _next_request_id(self) -> int:
+        # 1 is left to the initialize request
+        return next(self._request_ids)
+
+    def _jsonrpc_request(self, method: str, params: Dict[str, Any], timeout: float = 30,
+                         on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Send JSON-RPC request to MCP server
+
+        Args:
+            method: JSON-RPC method
+            params: Method parameters
+            timeout: Seconds to wait for the connection or between streamed messages
+            on_progress: Called with the params of each notifications/progress
+                the server streams for this request
+        """
+        progress = {}
+        if on_progress is not None:
+            params, progress = self._with_progress_token(params, on_progress)
 
         request_data = {
             "jsonrpc": "2.0",
-            "id": 1,
+            "id": self._next_request_id(),
             "method": method,
             "params": params
         }
 
+        def send():
+            try:
+                return self._post(request_data, timeout, progress)
+            except MCPSessionExpired:
+                return self._post(request_data, timeout, progress)
+
+        try:
+            # Identical concurrent requests (reruns, double submits) share one round trip
+            key = canonical_hash([self.base_url, method, params])
+            return mcp_single_flight.do(key, send)
+        except Exception as e:
+            logger.error(f"JSON-RPC request failed: {e}")
+            raise
+
+    def _jsonrpc_batch(self, calls: List[Tuple[str, Dict[str, Any]]], timeout: float = 30,
+                       on_progress: Optional[List[Optional[Callable[[Dict[str, Any]], None]]]] = None) -> List[Dict[str, Any]]:
+        """Send several JSON-RPC requests in one batch POST.
+
+        Args:
+            calls: (method, params) pairs
+            timeout: Seconds to wait for the connection or between streamed messages
+            on_progress: Optional progress callback per call
+
+        Returns:
+            The response to each call, in call order
+
+        Raises:
+            MCPBatchRejected: If the server does not support batches
+        """
+        batch, progress = self._build_batch(calls, on_progress)
+        try:
+            responses = self._post(batch, timeout, progress)
+        except MCPSessionExpired:
+            responses = self._post(batch, timeout, progress)
+        return self._match_batch(batch, responses)
+
+    @staticmethod
+    def _match_batch(batch: List[Dict[str, Any]], responses: Any) -> List[Dict[str, Any]]:
+        """Order batch responses by request.
+
+        Requests the server left unanswered get an error response, since
+        they may or may not have run.
+
+        Raises:
+            MCPBatchRejected: If the server answered with a single error object
+                without an ID, i.e. it could not process the batch at all
+        """
+        if isinstance(responses, dict):
+            responses = [responses]
+        if not isinstance(responses, list):
+            raise ValueError(f"Unexpected MCP batch response: {str(responses)[:200]}")
+        if (len(responses) == 1 and isinstance(responses[0], dict)
+                and responses[0].get("id") is None and "error" in responses[0]):
+            raise MCPBatchRejected(str(responses[0]["error"])[:200])
+
+        by_id = {response.get("id"): response for response in responses if isinstance(response, dict)}
+        missing = [request["id"] for request in batch if request["id"] not in by_id]
+        if missing:
+            logger.warning(f"MCP batch response is missing {len(missing)} of {len(batch)} requests")
+        return [by_id.get(request["id"]) or {
+            "jsonrpc": "2.0",
+            "id": request["id"],
+            "error": {"code": -32603, "message": "The server sent no response to this call"}
+        } for request in batch]
+
+    def _build_batch(self, calls: List[Tuple[str, Dict[str, Any]]],
+                     on_progress: Optional[List[Optional[Callable[[Dict[str, Any]], None]]]]
+                     ) -> Tuple[List[Dict[str, Any]], Dict[str, Callable[[Dict[str, Any]], None]]]:
+        batch, progress = [], {}
+        for index, (method, params) in enumerate(calls):
+            callback = on_progress[index] if on_progress else None
+            if callback is not None:
+                params, token = self._with_progress_token(params, callback)
+                progress.update(token)
+            batch.append({"jsonrpc": "2.0", "id": self._next_request_id(), "method": method, "params": params})
+        return batch, progress
+
+    @staticmethod
+    def _with_progress_token(params: Dict[str, Any], on_progress: Callable[[Dict[str, Any]], None]
+                             ) -> Tuple[Dict[str, Any], Dict[str, Callable[[Dict[str, Any]], None]]]:
+        """Ask the server for progress notifications on a request."""
+        token = uuid.uuid4().hex
+        params = dict(params, _meta={**params.get("_meta", {}), "progressToken": token})
+        return params, {token: on_progress}
+
+    def _post(self, payload: Union[Dict[str, Any], List[Dict[str, Any]]], timeout: float,
+              progress: Dict[str, Callable[[Dict[str, Any]], None]]) -> Any:
+        """POST a JSON-RPC request or batch and read the response, plain JSON or SSE."""
+        if not self.session_id:
+            # Concurrent first requests share one handshake
+            with self._session_lock:
+                self._initialize_session()
+        session_id = self.session_id
+
+        with self.http.post(
+            f"{self.base_url}/mcp",
+            json=payload,
+            headers=self._request_headers(session_id),
+            timeout=timeout,
+            stream=True
+        ) as response:
+            self._check_status(response, session_id, isinstance(payload, list))
+            if response.headers.get("Content-Type", "").startswith("text/event-stream"):
+                waiting = {request["id"] for request in (payload if isinstance(payload, list) else [payload])}
+                responses = []
+                for message in iter_sse_messages(response):
+                    done = self._handle_stream_message(message, waiting, responses, progress)
+                    if done is not None:
+                        return done if isinstance(payload, list) else done[0]
+                if isinstance(payload, list) and responses:
+                    # A partial batch; the unanswered calls are reported as failed
+                    return responses
+                raise Exception("MCP event stream ended without a response")
+            return response.json()
+
+    @staticmethod
+    def _request_headers(session_id: str) -> Dict[str, str]:
         headers = {
             "Content-Type": "application/json",
             "Accept": "application/json, text/event-stream"
         }
+        if session_id:
+            headers["Mcp-Session-Id"] = session_id
+            # Older servers read the session from this header instead
+            headers["X-Session-ID"] = session_id
+        return headers
+
+    def _check_status(self, response: Union["requests.Response", httpx.Response], session_id: str, batch: bool):
+        """Raise for an expired session, a rejected batch or any other HTTP error."""
+        # Servers answer 404 for sessions they have dropped (e.g. after a restart)
+        if session_id and response.status_code == 404:
+            self._reset_session(session_id)
+            raise MCPSessionExpired(session_id)
+        if batch and 400 <= response.status_code < 500:
+            raise MCPBatchRejected(f"HTTP {response.status_code}")
+        response.raise_for_status()
+
+    def _handle_stream_message(self, payload: Any, waiting: set, responses: List[Dict[str, Any]],
+                               progress: Dict[str, Callable[[Dict[str, Any]], None]]) -> Optional[List[Dict[str, Any]]]:
+        """Handle one message from an SSE response.
+
+        Collects JSON-RPC responses for the awaited request IDs and dispatches
+        notifications as they arrive. Returns the responses once the last one
+        is in, so the caller can close the stream, and None until then.
+        """
+        for message in payload if isinstance(payload, list) else [payload]:
+            if not isinstance(message, dict):
+                continue
+            if "method" not in message:
+                if message.get("id") in waiting:
+                    waiting.discard(message["id"])
+                    responses.append(message)
+                elif message.get("id") is None and "error" in message:
+                    # An error the server could not tie to a request, e.g. a rejected batch
+                    return [message]
+                continue
+            if message["method"] == "notifications/progress":
+                params = message.get("params") or {}
+                callback = progress.get(params.get("progressToken"))
+                if callback is not None:
+                    callback(params)
+            elif "id" not in message:
+                self.handle_notification(message)
+            else:
+                logger.warning(f"Ignoring MCP server request {message['method']}")
+        return responses if not waiting else None
+
+    def list_tools(self) -> List[Dict[str, Any]]:
+        """Get available tools from MCP server
+
+        The catalog is cached for tools_ttl seconds. An expired catalog is
+        still returned while a background refresh fetches the new one, so
+        only the very first call waits for the server. The same list object
+        is returned for as long as the catalog content does not change.
+        """
+        with self._tools_lock:
+            tools = self._tools
+            stale = time.monotonic() >= self._tools_expires_at
+        if tools is None:
+            self._refresh_tools()
+            with self._tools_lock:
+                return self._tools
+        if stale:
+            self._start_tools_refresh()
+        return tools
+
+    @property
+    def tools_version(self) -> str:
+        """Content hash of the cached tool catalog; changes whenever the catalog does."""
+        with self._tools_lock:
+            return self._tools_version
+
+    def invalidate_tools(self):
+        """Mark the tool catalog stale and refresh it in the background."""
+        with self._tools_lock:
+            self._tools_expires_at = 0.0
+            cached = self._tools is not None
+        if cached:
+            self._start_tools_refresh()
+
+    def handle_notification(self, message: Dict[str, Any]):
+        """Act on a server notification."""
+        if message.get("method") == "notifications/tools/list_changed":
+            logger.info("MCP tool list changed, refreshing catalog")
+            self.invalidate_tools()
+
+    def _start_tools_refresh(self):
+        with self._tools_lock:
+            if self._tools_refreshing:
+                return
+            self._tools_refreshing = True
+        threading.Thread(target=self._refresh_tools, name="mcp-tools-refresh", daemon=True).start()
+
+    def _refresh_tools(self):
+        """Fetch the catalog and swap it in; failures keep the current one."""
+        try:
+            tools = self._fetch_tools()
+        except Exception as e:
+            logger.warning(f"Failed to fetch tools from MCP server: {e}. Using mock tools.")
+            tools = None
+        self._store_tools(tools)
+
+    def _store_tools(self, tools: Optional[List[Dict[str, Any]]]):
+        """Swap in a fetched catalog; None records a failed fetch."""
+        ttl = self.tools_ttl if tools is not None else 0
+        with self._tools_lock:
+            self._tools_refreshing = False
+            # A failed refresh is retried on the next call, without blocking it
+            self._tools_expires_at = time.monotonic() + ttl
+            if tools is None:
+                if self._tools is None:
+                    self._tools = self._get_mock_tools()
+                    self._tools_version = tool_list_cache.fingerprint(self._tools)
+                return
+            version = tool_list_cache.fingerprint(tools)
+            if version != self._tools_version:
+                # Keeping the old list object lets caches keyed on it keep hitting
+                self._tools = tools
+                self._tools_version = version
+
+    def _fetch_tools(self) -> List[Dict[str, Any]]:
+        """Fetch tools/list and convert it to OpenAI format."""
+        return self._convert_tools(self._jsonrpc_request("tools/list", {}))
+
+    def _convert_tools(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert a tools/list response to OpenAI format."""
+        tools = result.get("result", {}).get("tools", [])
+        # Annotations such as readOnlyHint decide which results may be cached
+        self.tool_cache.update_metadata(tools)
+
+        # Convert MCP tool format to OpenAI format
+        openai_tools = []
+        for tool in tools:
+            openai_tool = {
+                "type": "function",
+                "function": {
+                    "name": tool["name"],
+                    "description": tool.get("description", ""),
+                    "parameters": tool.get("inputSchema", {})
+                }
+            }
+            openai_tools.append(openai_tool)
 
+        logger.info(f"Retrieved {len(openai_tools)} tools from MCP server")
+        return openai_tools
+
+    def call_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: float = MCP_TOOL_TIMEOUT,
+                  on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Execute a tool via MCP JSON-RPC
+
+        Args:
+            tool_name: Tool to call
+            arguments: Tool arguments
+            timeout: Seconds to wait for the connection or between streamed messages
+            on_progress: Called from the calling thread with each progress
+                notification's params ("progress", optional "total" and "message")
+        """
+        ttl = self.tool_cache.ttl_for(tool_name)
+        cache_key = self.tool_cache.make_key(self.base_url, tool_name, arguments) if ttl else None
+        if cache_key:
+            cached = self.tool_cache.get(tool_name, cache_key)
+            if cached is not None:
+                logger.info(f"Serving MCP tool {tool_name} from cache")
+                return cached
+
+        try:
+            logger.info(f"Calling MCP tool: {tool_name} with args: {arguments}")
+            result = self._jsonrpc_request("tools/call", {
+                "name": tool_name,
+                "arguments": arguments
+            }, timeout=timeout, on_progress=on_progress)
+            return self._tool_call_result(tool_name, result, cache_key, ttl)
+
+        except Exception as e:
+            logger.error(f"MCP tool call failed: {e}")
+            return self._fallback_to_mock(tool_name, arguments)
+
+    def call_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]], timeout: float = MCP_TOOL_TIMEOUT,
+                         on_progress: Optional[List[Optional[Callable[[Dict[str, Any]], None]]]] = None
+                         ) -> List[Dict[str, Any]]:
+        """Execute several tools in one JSON-RPC batch round trip.
+
+        Cached results are served without a request. If the server rejects
+        batches, batching is switched off for this client and the read-only
+        calls are made one by one; the others are reported as failed rather
+        than risk running a side effect twice.
+
+        Args:
+            calls: (tool_name, arguments) pairs
+            timeout: Seconds to wait for the connection or between streamed messages
+            on_progress: Optional progress callback per call, as in call_tool()
+
+        Returns:
+            The result of each call, in call order
+        """
+        results, to_send = self._cached_results(calls)
+        if len(to_send) > 1 and self.batch_supported:
+            try:
+                logger.info(f"Calling {len(to_send)} MCP tools in one batch")
+                responses = self._jsonrpc_batch(
+                    [("tools/call", {"name": calls[i][0], "arguments": calls[i][1]}) for i, _, _ in to_send],
+                    timeout=timeout,
+                    on_progress=[on_progress[i] if on_progress else None for i, _, _ in to_send]
+                )
+                for (index, cache_key, ttl), response in zip(to_send, responses):
+                    results[index] = self._batch_call_result(*calls[index], response, cache_key, ttl)
+                return results
+            except MCPBatchRejected as e:
+                logger.warning(f"MCP server rejected a JSON-RPC batch, calling tools one by one: {e}")
+                self.batch_supported = False
+                to_send = self._resendable(calls, to_send, results)
+            except Exception as e:
+                logger.error(f"MCP batch call failed: {e}")
+                for index, _, _ in to_send:
+                    results[index] = self._fallback_to_mock(*calls[index])
+                return results
+
+        for index, _, _ in to_send:
+            results[index] = self.call_tool(*calls[index], timeout=timeout,
+                                            on_progress=on_progress[index] if on_progress else None)
+        return results
+
+    def _batch_call_result(self, tool_name: str, arguments: Dict[str, Any], response: Dict[str, Any],
+                           cache_key: Optional[str], ttl: float) -> Dict[str, Any]:
+        """Extract one call's result from a batch response."""
+        if "error" in response:
+            message = (response["error"] or {}).get("message", "Tool call failed")
+            logger.error(f"MCP tool {tool_name} failed in a batch: {message}")
+            return self._tool_error(tool_name, message)
+        try:
+            return self._tool_call_result(tool_name, response, cache_key, ttl)
+        except Exception as e:
+            logger.error(f"MCP tool call failed: {e}")
+            return self._fallback_to_mock(tool_name, arguments)
+
+    def _resendable(self, calls: List[Tuple[str, Dict[str, Any]]], to_send: List[Tuple[int, Optional[str], float]],
+                    results: List[Optional[Dict[str, Any]]]) -> List[Tuple[int, Optional[str], float]]:
+        """Keep the read-only calls of a rejected batch, failing the others."""
+        resend = []
+        for entry in to_send:
+            tool_name = calls[entry[0]][0]
+            if self.tool_cache.is_read_only(tool_name):
+                resend.append(entry)
+            else:
+                logger.warning(f"Not re-sending {tool_name} from a rejected batch, it may have side effects")
+                results[entry[0]] = self._tool_error(
+                    tool_name, "The server rejected the batched call; call the tool again to retry it")
+        return resend
+
+    @staticmethod
+    def _tool_error(tool_name: str, message: str) -> Dict[str, Any]:
+        return {
+            "status": "error",
+            "result_type": tool_name,
+            "message": message
+        }
+
+    def _cached_results(self, calls: List[Tuple[str, Dict[str, Any]]]
+                        ) -> Tuple[List[Optional[Dict[str, Any]]], List[Tuple[int, Optional[str], float]]]:
+        """Serve batch calls from the result cache; returns the results and (index, cache_key, ttl) to send."""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        to_send = []
+        for index, (tool_name, arguments) in enumerate(calls):
+            ttl = self.tool_cache.ttl_for(tool_name)
+            cache_key = self.tool_cache.make_key(self.base_url, tool_name, arguments) if ttl else None
+            cached = self.tool_cache.get(tool_name, cache_key) if cache_key else None
+            if cached is not None:
+                logger.info(f"Serving MCP tool {tool_name} from cache")
+                results[index] = cached
+            else:
+                to_send.append((index, cache_key, ttl))
+        return results, to_send
+
+    def _tool_call_result(self, tool_name: str, result: Dict[str, Any], cache_key: Optional[str],
+                          ttl: float) -> Dict[str, Any]:
+        """Extract the actual tool result from a tools/call response, caching it if allowed."""
+        if result.get("result", {}).get("content"):
+            content = result["result"]["content"]
+            if len(content) > 0 and content[0].get("text"):
+                tool_result = json.loads(content[0]["text"])
+                # Only successful server results are cached, never mock fallbacks
+                if cache_key and isinstance(tool_result, dict) and tool_result.get("status") == "success":
+                    self.tool_cache.set(tool_name, cache_key, tool_result, ttl)
+                return tool_result
+        return {}
+
+    def invalidate_tool_cache(self, tool_name: Optional[str] = None,
+                              arguments: Optional[Dict[str, Any]] = None) -> int:
+        """Drop cached results for a tool call, a whole tool, or all tools."""
+        if tool_name is not None and arguments is not None:
+            return self.tool_cache.invalidate(key=self.tool_cache.make_key(self.base_url, tool_name, arguments))
+        return self.tool_cache.invalidate(tool_name=tool_name)
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get the pooled async HTTP client bound to the running event loop.
+
+        httpx connections cannot cross event loops, so a new client is
+        created if this one is first used from a different loop, and the
+        old one is closed on its own loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            if self._async_client is not None and self._async_loop is not loop:
+                # The old client's connections belong to its own loop
+                close_on_loop(self._async_client, self._async_loop)
+                self._async_client = None
+            if self._async_client is None:
+                self._async_client = httpx.AsyncClient(
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(max_connections=self.pool_size,
+                                        max_keepalive_connections=self.pool_size)
+                )
+                self._async_loop = loop
+                self._async_session_lock = asyncio.Lock()
+            return self._async_client
+
+    async def _ainitialize_session(self):
+        """Async counterpart of _initialize_session()."""
         if self.session_id:
-            headers["X-Session-ID"] = self.session_id
+            return
 
         try:
-            response = requests.post(
+            response = await self._get_async_client().post(
                 f"{self.base_url}/mcp",
-                json=request_data,
-                headers=headers,
-                timeout=30
+                json=_INITIALIZE_REQUEST,
+                headers=self._request_headers(""),
+                timeout=10
             )
             response.raise_for_status()
-            return response.json()
+
+            session_id = response.headers.get("mcp-session-id")
+            if session_id:
+                self.session_id = session_id
+                logger.info(f"Initialized MCP session: {self.session_id} (HTTP {response.http_version})")
+            else:
+                logger.warning("No session ID in initialize response")
+
+        except Exception as e:
+            logger.warning(f"Failed to initialize MCP session: {e}")
+
+    async def _apost(self, payload: Union[Dict[str, Any], List[Dict[str, Any]]], timeout: float,
+                     progress: Dict[str, Callable[[Dict[str, Any]], None]]) -> Any:
+        """Async counterpart of _post()."""
+        client = self._get_async_client()
+        if not self.session_id:
+            # Concurrent first requests on the loop share one handshake
+            async with self._async_session_lock:
+                await self._ainitialize_session()
+        session_id = self.session_id
+
+        async with client.stream(
+            "POST",
+            f"{self.base_url}/mcp",
+            json=payload,
+            headers=self._request_headers(session_id),
+            timeout=timeout
+        ) as response:
+            if response.status_code >= 400:
+                await response.aread()
+            self._check_status(response, session_id, isinstance(payload, list))
+            if response.headers.get("Content-Type", "").startswith("text/event-stream"):
+                waiting = {request["id"] for request in (payload if isinstance(payload, list) else [payload])}
+                responses = []
+                async for message in aiter_sse_messages(response):
+                    done = self._handle_stream_message(message, waiting, responses, progress)
+                    if done is not None:
+                        return done if isinstance(payload, list) else done[0]
+                if isinstance(payload, list) and responses:
+                    # A partial batch; the unanswered calls are reported as failed
+                    return responses
+                raise Exception("MCP event stream ended without a response")
+            return json.loads(await response.aread())
+
+    async def _ajsonrpc_request(self, method: str, params: Dict[str, Any], timeout: float = 30,
+                                on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Async counterpart of _jsonrpc_request()."""
+        progress = {}
+        if on_progress is not None:
+            params, progress = self._with_progress_token(params, on_progress)
+
+        request_data = {
+            "jsonrpc": "2.0",
+            "id": self._next_request_id(),
+            "method": method,
+            "params": params
+        }
+
+        async def send():
+            try:
+                return await self._apost(request_data, timeout, progress)
+            except MCPSessionExpired:
+                return await self._apost(request_data, timeout, progress)
+
+        try:
+            key = canonical_hash([self.base_url, method, params])
+            return await mcp_single_flight.ado(key, send)
         except Exception as e:
             logger.error(f"JSON-RPC request failed: {e}")
             raise
 
-    def list_tools(self) -> List[Dict[str, Any]]:
-        """Get available tools from MCP server"""
+    async def _ajsonrpc_batch(self, calls: List[Tuple[str, Dict[str, Any]]], timeout: float = 30,
+                              on_progress: Optional[List[Optional[Callable[[Dict[str, Any]], None]]]] = None
+                              ) -> List[Dict[str, Any]]:
+        """Async counterpart of _jsonrpc_batch()."""
+        batch, progress = self._build_batch(calls, on_progress)
         try:
-            result = self._jsonrpc_request("tools/list", {})
-            tools = result.get("result", {}).get("tools", [])
-
-            # Convert MCP tool format to OpenAI format
-            openai_tools = []
-            for tool in tools:
-                openai_tool = {
-                    "type": "function",
-                    "function": {
-                        "name": tool["name"],
-                        "description": tool.get("description", ""),
-                        "parameters": tool.get("inputSchema", {})
-                    }
-                }
-                openai_tools.append(openai_tool)
+            responses = await self._apost(batch, timeout, progress)
+        except MCPSessionExpired:
+            responses = await self._apost(batch, timeout, progress)
+        return self._match_batch(batch, responses)
 
-            logger.info(f"Retrieved {len(openai_tools)} tools from MCP server")
-            return openai_tools
+    async def alist_tools(self) -> List[Dict[str, Any]]:
+        """Async counterpart of list_tools(); stale catalogs are refreshed in a loop task."""
+        with self._tools_lock:
+            tools = self._tools
+            stale = time.monotonic() >= self._tools_expires_at
+            refresh = stale and tools is not None and not self._tools_refreshing
+            if refresh:
+                self._tools_refreshing = True
+        if tools is None:
+            await self._arefresh_tools()
+            with self._tools_lock:
+                return self._tools
+        if refresh:
+            asyncio.get_running_loop().create_task(self._arefresh_tools())
+        return tools
 
+    async def _arefresh_tools(self):
+        try:
+            tools = self._convert_tools(await self._ajsonrpc_request("tools/list", {}))
         except Exception as e:
             logger.warning(f"Failed to fetch tools from MCP server: {e}. Using mock tools.")
-            return self._get_mock_tools()
+            tools = None
+        self._store_tools(tools)
+
+    async def acall_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: float = MCP_TOOL_TIMEOUT,
+                         on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Async counterpart of call_tool(); on_progress runs on the event loop."""
+        results, to_send = self._cached_results([(tool_name, arguments)])
+        if not to_send:
+            return results[0]
+        _, cache_key, ttl = to_send[0]
 
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a tool via MCP JSON-RPC"""
         try:
             logger.info(f"Calling MCP tool: {tool_name} with args: {arguments}")
-            result = self._jsonrpc_request("tools/call", {
+            result = await self._ajsonrpc_request("tools/call", {
                 "name": tool_name,
                 "arguments": arguments
-            })
-
-            # Extract the actual tool result from MCP response
-            if result.get("result", {}).get("content"):
-                content = result["result"]["content"]
-                if len(content) > 0 and content[0].get("text"):
-                    return json.loads(content[0]["text"])
-            return {}
+            }, timeout=timeout, on_progress=on_progress)
+            return self._tool_call_result(tool_name, result, cache_key, ttl)
 
         except Exception as e:
             logger.error(f"MCP tool call failed: {e}")
             return self._fallback_to_mock(tool_name, arguments)
 
+    async def acall_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]], timeout: float = MCP_TOOL_TIMEOUT,
+                                on_progress: Optional[List[Optional[Callable[[Dict[str, Any]], None]]]] = None
+                                ) -> List[Dict[str, Any]]:
+        """Async counterpart of call_tools_batch(); without batching the calls run concurrently."""
+        results, to_send = self._cached_results(calls)
+        if len(to_send) > 1 and self.batch_supported:
+            try:
+                logger.info(f"Calling {len(to_send)} MCP tools in one batch")
+                responses = await self._ajsonrpc_batch(
+                    [("tools/call", {"name": calls[i][0], "arguments": calls[i][1]}) for i, _, _ in to_send],
+                    timeout=timeout,
+                    on_progress=[on_progress[i] if on_progress else None for i, _, _ in to_send]
+                )
+                for (index, cache_key, ttl), response in zip(to_send, responses):
+                    results[index] = self._batch_call_result(*calls[index], response, cache_key, ttl)
+                return results
+            except MCPBatchRejected as e:
+                logger.warning(f"MCP server rejected a JSON-RPC batch, calling tools one by one: {e}")
+                self.batch_supported = False
+                to_send = self._resendable(calls, to_send, results)
+            except Exception as e:
+                logger.error(f"MCP batch call failed: {e}")
+                for index, _, _ in to_send:
+                    results[index] = self._fallback_to_mock(*calls[index])
+                return results
+
+        singles = await asyncio.gather(*(
+            self.acall_tool(*calls[index], timeout=timeout, on_progress=on_progress[index] if on_progress else None)
+            for index, _, _ in to_send
+        ))
+        for (index, _, _), result in zip(to_send, singles):
+            results[index] = result
+        return results
+
+    async def aclose(self):
+        """Close pooled async connections held by this client."""
+        with self._async_lock:
+            async_client = self._async_client
+            self._async_client = None
+            self._async_loop = None
+
+        if async_client is not None:
+            await async_client.aclose()
+
     def _get_mock_tools(self) -> List[Dict[str, Any]]:
         """Get mock tools as fallback"""
         return [
@@ -192,11 +888,7 @@ class MCPHTTPClient:
         elif tool_name == "check_order_status":
             return self._mock_order_status(arguments)
         else:
-            return {
-                "status": "error",
-                "result_type": tool_name,
-                "message": "Tool not available"
-            }
+            return self._tool_error(tool_name, "Tool not available")
 
     def _mock_expedite_email(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Mock expedite email tool."""
@@ -293,4 +985,19 @@ class MCPHTTPClient:
             },
             "result_summary": f"Order {po_number} status: {status}",
             "meta": {"version": "1.0.0", "locale": "en"}
-        }
\ No newline at end of file
+        }
+
+
+def get_mcp_client(base_url: str = MCP_SERVER_URL) -> MCPHTTPClient:
+    """Get the shared MCP client for a server.
+
+    Clients are cached per process so the initialize handshake and the
+    keep-alive connections are reused across reruns and sessions.
+    """
+    base_url = base_url.rstrip('/')
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = MCPHTTPClient(base_url)
+            _clients[base_url] = client
+        return client
@@ -1,242 +1,689 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Generator, Tuple, Callable
 import json
-from .llm_factory import get_llm_client
-from .mcp_client import MCPHTTPClient
+import queue
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from .llm_factory import get_llm_client, parse_endpoints
+from .llm_client import LLMClient
+from .mcp_client import get_mcp_client
+from .tool_call_parser import ToolCallParser, make_call_id
+from .result_formatters import format_tool_results
+from .tool_prompt import get_tool_prompt, compact_json, REPAIR_PROMPT_TEMPLATE
+from .tool_schemas import (validate_arguments, get_response_format, get_arguments_format,
+                           extract_json_object, parse_structured_response)
+from .tool_router import ToolRouter
+from .tool_prefetch import get_tool_prefetcher
+from .event_loop import submit_coroutine
 from utils.logging import get_logger
-from utils.config import get_config
+from utils.config import get_config, parse_tool_seconds
+from config.constants import MCP_TOOL_TIMEOUT, MCP_TOOL_TIMEOUTS, MCP_TOOL_MAX_WORKERS, MCP_ASYNC_CLIENT
 
 logger = get_logger(__name__)
 
+# Shared across orchestrators; bounds concurrent MCP tool calls per process
+_tool_executor = ThreadPoolExecutor(max_workers=MCP_TOOL_MAX_WORKERS, thread_name_prefix="mcp-tool")
+
+
 class ChatOrchestrator:
     """Orchestrates chat interactions with MCP tool support using two-call pattern."""
 
     def __init__(self):
         self.config = get_config()
-        self.mcp_client = MCPHTTPClient(self.config['mcp_base_url'])
+        self.mcp_client = get_mcp_client(self.config['mcp_base_url'])
         self.max_tool_chain = 3  # Prevent infinite loops
-
-    def chat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        self.tool_timeouts = parse_tool_seconds(MCP_TOOL_TIMEOUTS)
+        self.tool_router = ToolRouter()
+        self.prefetcher = get_tool_prefetcher()
+        # Backend capabilities resolved for the current turn, by stage target
+        self._turn_capabilities: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def chat_with_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                        preset: Optional[Dict[str, Any]] = None, language: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute chat with MCP tool orchestration using two-call pattern.
 
         Args:
             messages: Chat messages
             tools: Available MCP tools
+            preset: Active prompt preset; its response_mode and pinned tools apply
+            language: The session's language for template-rendered answers
 
         Returns:
             Dict with response content and tool results
         """
-        tool_chain_count = 0
+        final = {}
+        for event in self.iter_chat_events(messages, tools, preset, language):
+            if event["type"] == "final":
+                final = event
+
+        return {
+            "content": final["content"],
+            "tool_results": final["tool_results"],
+            "final_response": True
+        }
+
+    def iter_chat_events(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                         preset: Optional[Dict[str, Any]] = None, language: Optional[str] = None
+                         ) -> Iterator[Dict[str, Any]]:
+        """
+        Execute chat with MCP tool orchestration, yielding events as they happen.
+
+        Every event is a dict with a "type" key:
+            completion_started: {"phase": "tools" | "answer", "model", "escalated"} -
+                escalated marks tool selection retried on the answer model
+            token: {"text"} - a fragment of the answer; fragments streamed
+                before a tool call was detected are preamble, not the answer
+            tool_call_detected: {"name", "tool_call"} - tool_call is None while
+                the arguments are still being generated
+            tool_started: {"tool_call"}
+            tool_progress: {"tool_call", "progress", "total", "message"}
+            tool_finished: {"tool_call", "result", "elapsed"}
+            final: {"content", "tool_results"}
+
+        Args:
+            messages: Chat messages
+            tools: Available MCP tools
+            preset: Active prompt preset; its response_mode and pinned tools apply
+            language: The session's language for template-rendered answers
+        """
+        self._turn_capabilities = {}
+        tools = self._select_tools(messages, tools, preset)
+        # Likely read-only calls run while the first completion is generated
+        prefetched = self._start_prefetch(messages, tools)
         current_messages = messages.copy()
         all_tool_results = []
 
-        while tool_chain_count < self.max_tool_chain:
-            # First call: allow tools
-            response1 = self._first_completion(current_messages, tools)
+        for _ in range(self.max_tool_chain):
+            response1 = yield from self._iter_tool_completion_events(current_messages, tools, "tool")
+            if self._should_escalate(response1.get("tool_calls"), response1.get("malformed_tool_call", False), tools):
+                logger.warning("Tool model produced an unusable tool call, retrying with the answer model")
+                response1 = yield from self._iter_tool_completion_events(current_messages, tools, "answer")
+
+            tool_calls = response1.get("tool_calls")
+            if not tool_calls:
+                # No tools called, the streamed text is the answer
+                self.prefetcher.discard(prefetched)
+                yield {"type": "final", "content": response1["content"], "tool_results": all_tool_results}
+                return
+
+            for tool_call in tool_calls:
+                yield {"type": "tool_started", "tool_call": tool_call}
+            tool_results: List[Optional[Dict[str, Any]]] = [None] * len(tool_calls)
+            for event in self._iter_tool_events(tool_calls, prefetched):
+                index = event.pop("index")
+                if event["type"] == "tool_finished":
+                    tool_results[index] = event["result"]
+                yield dict(event, tool_call=tool_calls[index])
+            all_tool_results.extend(tool_results)
+            self._append_tool_turn(current_messages, response1["content"], tool_calls, tool_results)
 
-            if not response1.get("tool_calls"):
-                # No tools called, return final response
-                return {
-                    "content": response1["content"],
-                    "tool_results": all_tool_results,
-                    "final_response": True
-                }
+            if not self._should_continue_chain(tool_results):
+                break
 
-            # Execute tools
-            tool_results = self._execute_tools(response1["tool_calls"])
-            all_tool_results.extend(tool_results)
+        self.prefetcher.discard(prefetched)
+        content = self._format_from_templates(all_tool_results, (preset or {}).get('response_mode'), language)
+        if content is None:
+            yield {"type": "completion_started", "phase": "answer", "model": self._stage_model("answer"),
+                   "escalated": False}
+            fragments = []
+            for fragment in self._stream_second_completion(current_messages, tools):
+                fragments.append(fragment)
+                yield {"type": "token", "text": fragment}
+            content = "".join(fragments)
+        else:
+            yield {"type": "token", "text": content}
+
+        yield {"type": "final", "content": content, "tool_results": all_tool_results}
+
+    def _iter_tool_completion_events(self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]],
+                                     stage: str) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+        """Stream a tool-selection completion as events; returns the response with its tool calls."""
+        yield {"type": "completion_started", "phase": "tools", "model": self._stage_model(stage),
+               "escalated": stage != "tool"}
+
+        if tools and (self._use_native_tools(stage) or self._use_structured_output(stage)):
+            # Native tool calls are not streamed by the adapters and structured
+            # replies are JSON, so the reply is taken whole
+            response = self._tool_completion(messages, tools, stage)
+            for tool_call in response.get("tool_calls") or []:
+                yield {"type": "tool_call_detected", "name": tool_call["function"]["name"], "tool_call": tool_call}
+            if not response.get("tool_calls") and response.get("content"):
+                yield {"type": "token", "text": response["content"]}
+            return response
+
+        parser = ToolCallParser()
+        announced = False
+        for chunk in self._stream_first_completion(messages, tools, stage):
+            for tool_call in parser.feed(chunk):
+                yield {"type": "tool_call_detected", "name": tool_call["function"]["name"], "tool_call": tool_call}
+            if parser.detected:
+                if parser.pending_name and not announced:
+                    yield {"type": "tool_call_detected", "name": parser.pending_name, "tool_call": None}
+                announced = parser.pending_name is not None
+                continue
+            text = parser.take_text()
+            if text:
+                yield {"type": "token", "text": text}
+        for tool_call in parser.finish():
+            yield {"type": "tool_call_detected", "name": tool_call["function"]["name"], "tool_call": tool_call}
+        response = self._repair_tool_calls(messages, tools, {
+            "content": parser.content,
+            "tool_calls": parser.tool_calls,
+            "unparsed_tool_calls": parser.unparsed_calls,
+            "malformed_tool_call": parser.detected and not parser.tool_calls
+        }, stage)
+        for tool_call in response["tool_calls"]:
+            if tool_call not in parser.tool_calls:
+                yield {"type": "tool_call_detected", "name": tool_call["function"]["name"], "tool_call": tool_call}
+        if not response["tool_calls"]:
+            text = parser.take_text()
+            if text:
+                yield {"type": "token", "text": text}
+        return response
 
-            # Append assistant message with tool calls
-            current_messages.append({
-                "role": "assistant",
-                "content": response1["content"],
-                "tool_calls": [
-                    {
-                        "id": tc["id"],
-                        "type": tc["type"],
-                        "function": {
-                            "name": tc["function"]["name"],
-                            "arguments": tc["function"]["arguments"]
-                        }
-                    } for tc in response1["tool_calls"]
-                ]
+    def _append_tool_turn(self, messages: List[Dict[str, Any]], content: Optional[str],
+                          tool_calls: List[Dict[str, Any]], tool_results: List[Dict[str, Any]]):
+        """Append the assistant message with its tool calls, then the tool results."""
+        messages.append({
+            "role": "assistant",
+            "content": content,
+            "tool_calls": [
+                {
+                    "id": tc["id"],
+                    "type": tc["type"],
+                    "function": {
+                        "name": tc["function"]["name"],
+                        "arguments": tc["function"]["arguments"]
+                    }
+                } for tc in tool_calls
+            ]
+        })
+
+        for result in tool_results:
+            messages.append({
+                "role": "tool",
+                "tool_call_id": result["tool_call_id"],
+                "content": result["content"]
             })
 
-            # Append tool results
-            for result in tool_results:
-                current_messages.append({
-                    "role": "tool",
-                    "tool_call_id": result["tool_call_id"],
-                    "content": result["content"]
-                })
+    def _select_tools(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]],
+                      preset: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Narrow the tool catalog to the tools relevant for the latest user turn."""
+        if tools is None:
+            tools = self.mcp_client.list_tools()
 
-            tool_chain_count += 1
+        query = self._last_user_text(messages)
+        preset_text = " ".join(m.get("content") or "" for m in messages if m["role"] == "system")
+        return self.tool_router.select(tools, query, preset_text, pinned=(preset or {}).get('tools'))
 
-            # Check if we should continue the chain
-            if not self._should_continue_chain(tool_results):
-                break
+    def _last_user_text(self, messages: List[Dict[str, Any]]) -> str:
+        """Get the content of the latest user message."""
+        return next((m.get("content") or "" for m in reversed(messages) if m["role"] == "user"), "")
 
-        # Second call: format-only with tool_choice="none"
-        response2 = self._second_completion(current_messages, tools)
+    def _start_prefetch(self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> Dict[str, Future]:
+        """Start speculative tool calls for entities in the user turn, when enabled."""
+        if not self.config['tool_prefetch_enabled']:
+            return {}
+        return self.prefetcher.start(self._last_user_text(messages), tools, _tool_executor, self._prefetch_tool)
 
-        return {
-            "content": response2["content"],
-            "tool_results": all_tool_results,
-            "final_response": True
-        }
+    def _prefetch_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Call a tool ahead of the model; the result is kept until the model asks for it."""
+        return self.mcp_client.call_tool(tool_name, arguments,
+                                         timeout=self.tool_timeouts.get(tool_name, MCP_TOOL_TIMEOUT))
+
+    def _format_from_templates(self, tool_results: List[Dict[str, Any]],
+                               response_mode: Optional[str] = None,
+                               language: Optional[str] = None) -> Optional[str]:
+        """Render tool results with registered templates in template mode.
 
-    def _build_tool_descriptions(self, tools: List[Dict[str, Any]]) -> str:
-        """Build tool descriptions for prompting."""
-        descriptions = []
-        for tool in tools:
-            func = tool["function"]
-            desc = f"- {func['name']}: {func['description']}\n  Parameters: {json.dumps(func['parameters'], indent=2)}"
-            descriptions.append(desc)
-        return "\n".join(descriptions)
+        Returns None when the formatting completion is still needed.
+        """
+        if not response_mode or response_mode == "default":
+            response_mode = self.config['response_mode']
+        if response_mode != "template":
+            return None
+
+        content = format_tool_results(tool_results, language)
+        if content is not None:
+            logger.info("All tool results have templates, skipping the formatting completion")
+        return content
+
+    def _get_llm_client(self, stage: Optional[str] = None) -> LLMClient:
+        """Get the shared LLM client for a stage's endpoints, or the configured endpoint or pool.
+
+        Args:
+            stage: "tool" for tool selection, "answer" for the formatting completion
+        """
+        return get_llm_client(
+            self.config['llm_api_flavor'],
+            self.config['llm_base_url'],
+            self.config['llm_port'],
+            pool_size=self.config['llm_pool_size'],
+            cache_mode=self.config['llm_cache_mode'],
+            endpoints=parse_endpoints(self._stage_target(stage)[1]),
+            hedge=self.config['llm_hedge_enabled']
+        )
+
+    def _stage_model(self, stage: Optional[str] = None) -> str:
+        """Get the model for a stage, falling back to the default model."""
+        return self._stage_target(stage)[0]
+
+    def _stage_target(self, stage: Optional[str] = None) -> Tuple[str, str]:
+        """Get the (model, endpoints) a stage runs on; unset values fall back to the defaults."""
+        if stage is None:
+            return self.config['llm_default_model'], self.config['llm_endpoints']
+        return (self.config[f'llm_{stage}_model'] or self.config['llm_default_model'],
+                self.config[f'llm_{stage}_endpoints'] or self.config['llm_endpoints'])
 
     def _parse_tool_calls_from_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """Parse tool calls from LLM response when using prompting."""
-        content = response.get("content", "").strip()
-        print(f"DEBUG: Parsing tool calls from response: {content[:200]}...")
+        if response.get("tool_calls"):
+            return response
+
+        content = response.get("content") or ""
+        logger.debug(f"Parsing tool calls from response: {content[:200]}...")
+
+        parser = ToolCallParser()
+        parser.feed(content)
+        parser.finish()
+        if parser.unparsed_calls:
+            response["unparsed_tool_calls"] = parser.unparsed_calls
+        if parser.tool_calls:
+            response["tool_calls"] = parser.tool_calls
+            # Remove the tool calls from content
+            response["content"] = parser.content
+            logger.debug(f"Parsed tool calls: {[tc['function']['name'] for tc in parser.tool_calls]}")
+        elif parser.detected:
+            # The model tried to call a tool but the call could not be parsed
+            response["malformed_tool_call"] = True
+            logger.debug("Tool call found in response but could not be parsed")
+        else:
+            logger.debug("No tool call found in response")
 
-        # Check for custom tool format: <|start|>assistant<|channel|>commentary to=functions.{tool_name} <|constrain|>json<|message|>{json}
-        if content.startswith("<|start|>assistant<|channel|>commentary to=functions."):
-            try:
-                # Extract tool name
-                start_tool = content.find("functions.") + len("functions.")
-                end_tool = content.find(" <|constrain|>")
-                tool_name = content[start_tool:end_tool]
-
-                # Extract JSON args
-                start_json = content.find("<|message|>") + len("<|message|>")
-                json_str = content[start_json:].strip()
-                if json_str.startswith("{") and json_str.endswith("}"):
-                    args = json.loads(json_str)
-
-                    # Convert to OpenAI format
-                    response["tool_calls"] = [{
-                        "id": f"call_{hash(content)}",
-                        "type": "function",
-                        "function": {
-                            "name": tool_name,
-                            "arguments": json.dumps(args)
-                        }
-                    }]
-                    # Remove the tool call from content
-                    response["content"] = ""
-                    print(f"DEBUG: Parsed custom tool call: {tool_name} with args: {args}")
-                    return response
-            except (ValueError, json.JSONDecodeError) as e:
-                print(f"DEBUG: Failed to parse custom tool format: {e}")
-
-        # Fallback to original JSON parsing
-        try:
-            # Look for JSON object in the content
-            start = content.find('{')
-            end = content.rfind('}') + 1
-            if start != -1 and end > start:
-                json_str = content[start:end]
-                tool_call = json.loads(json_str)
-                if "tool" in tool_call and "arguments" in tool_call:
-                    # Convert to OpenAI format
-                    response["tool_calls"] = [{
-                        "id": f"call_{hash(json_str)}",
-                        "type": "function",
-                        "function": {
-                            "name": tool_call["tool"],
-                            "arguments": json.dumps(tool_call["arguments"])
-                        }
-                    }]
-                    # Remove the tool call from content
-                    response["content"] = content[:start] + content[end:]
-                    print(f"DEBUG: Parsed tool call: {tool_call['tool']}")
-        except json.JSONDecodeError:
-            print("DEBUG: No valid tool call JSON found in response")
+        return response
 
+    def _tool_completion(self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]],
+                         stage: str) -> Dict[str, Any]:
+        """Run a tool-selection completion on a stage's model and parse its tool calls."""
+        client = self._get_llm_client(stage)
+
+        if tools and self._use_native_tools(stage):
+            # The backend takes the tools array itself and may constrain decoding to it
+            result = client.chat_with_tools(
+                messages=messages,
+                model=self._stage_model(stage),
+                temperature=0.7,
+                max_tokens=2048,
+                cache=self.config['llm_cache_mode'] == "always",
+                tools=tools,
+                tool_choice="auto"
+            )
+        elif tools and self._use_structured_output(stage):
+            # Decoding is constrained to tool calls with schema-valid arguments, or an answer
+            result = client.chat(
+                messages=self._with_tool_prompt(messages, tools, structured=True),
+                model=self._stage_model(stage),
+                temperature=0.7,
+                max_tokens=2048,
+                cache=self.config['llm_cache_mode'] == "always",
+                response_format=get_response_format(tools)
+            )
+            structured = parse_structured_response(result.get("content") or "")
+            if structured is not None:
+                result["content"], tool_calls = structured
+                if tool_calls:
+                    result["tool_calls"] = tool_calls
+        else:
+            # Use prompting for tool calling
+            result = client.chat(
+                messages=self._with_tool_prompt(messages, tools),
+                model=self._stage_model(stage),
+                temperature=0.7,
+                max_tokens=2048,
+                cache=self.config['llm_cache_mode'] == "always"
+            )
+        result = self._parse_tool_calls_from_response(result)
+        return self._repair_tool_calls(messages, tools, result, stage)
+
+    def _use_structured_output(self, stage: str) -> bool:
+        """Whether a stage's backend can constrain prompt-based tool selection to a JSON schema."""
+        if not self.config['llm_structured_output']:
+            return False
+        return self._stage_capabilities(stage)["json_schema"]
+
+    def _repair_tool_calls(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]],
+                           response: Dict[str, Any], stage: str) -> Dict[str, Any]:
+        """Validate tool call arguments and repair invalid ones with one targeted retry each.
+
+        Covers parsed calls whose arguments break the tool's input schema and
+        calls whose arguments were not valid JSON at all. A call that cannot
+        be repaired is kept as is, so the tool reports the problem; one that
+        could not be parsed is dropped.
+        """
+        offered = {tool["function"]["name"]: tool for tool in tools or []}
+        tool_calls, repaired = [], False
+        for tool_call in response.get("tool_calls") or []:
+            errors = validate_arguments(tools, tool_call) if tool_call["function"]["name"] in offered else []
+            if errors:
+                fixed = self._repair_arguments(messages, offered[tool_call["function"]["name"]], tool_call, errors, stage)
+                repaired = repaired or fixed is not None
+                tool_call = fixed or tool_call
+            tool_calls.append(tool_call)
+
+        for unparsed in response.get("unparsed_tool_calls") or []:
+            if unparsed["name"] not in offered:
+                continue
+            tool_call = {
+                "id": make_call_id(len(tool_calls), unparsed["name"], unparsed["arguments"]),
+                "type": "function",
+                "function": {"name": unparsed["name"], "arguments": unparsed["arguments"]}
+            }
+            fixed = self._repair_arguments(messages, offered[unparsed["name"]], tool_call,
+                                           validate_arguments(tools, tool_call), stage)
+            if fixed is not None:
+                tool_calls.append(fixed)
+                repaired = True
+
+        if not repaired:
+            return response
+        response = dict(response, tool_calls=tool_calls, unparsed_tool_calls=[])
+        response["malformed_tool_call"] = response.get("malformed_tool_call", False) and not tool_calls
         return response
 
-    def _first_completion(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
-        """First completion that allows tool usage."""
-        # Get available tools if not provided
-        if tools is None:
-            tools = self.mcp_client.list_tools()
+    def _repair_arguments(self, messages: List[Dict[str, Any]], tool: Dict[str, Any], tool_call: Dict[str, Any],
+                          errors: List[str], stage: str) -> Optional[Dict[str, Any]]:
+        """Ask the model to correct one call's arguments; returns the fixed call, or None."""
+        name = tool_call["function"]["name"]
+        logger.warning(f"Repairing arguments of {name}: {'; '.join(errors)}")
+        schema = tool["function"].get("parameters") or {"type": "object"}
+        client = self._get_llm_client(stage)
+        kwargs = {}
+        if self._use_structured_output(stage):
+            kwargs["response_format"] = get_arguments_format(tool)
 
-        print(f"DEBUG: Making first completion with {len(tools)} tools")
-        for tool in tools[:2]:  # Log first 2 tools
-            print(f"DEBUG: Tool: {tool['function']['name']}")
+        result = client.chat(
+            messages=messages + [
+                {"role": "assistant", "content": f"{name}({tool_call['function']['arguments']})"},
+                {"role": "user", "content": REPAIR_PROMPT_TEMPLATE.format(
+                    tool=name, errors="\n".join(errors), schema=compact_json(schema))}
+            ],
+            model=self._stage_model(stage),
+            temperature=0,
+            max_tokens=1024,
+            **kwargs
+        )
+        arguments = extract_json_object(result.get("content") or "")
+        if arguments is None:
+            logger.warning(f"Repair of {name} returned no JSON object")
+            return None
+
+        fixed = dict(tool_call, function={"name": name, "arguments": json.dumps(arguments, ensure_ascii=False)})
+        errors = validate_arguments([tool], fixed)
+        if errors:
+            logger.warning(f"Repaired arguments of {name} are still invalid: {'; '.join(errors)}")
+            return None
+        return fixed
+
+    def _use_native_tools(self, stage: str) -> bool:
+        """Whether a stage's backend takes tools natively rather than via the tool prompt."""
+        mode = self.config['llm_tool_calling']
+        if mode == "auto":
+            return self._stage_capabilities(stage)["native_tools"]
+        return mode == "native"
+
+    def _stage_capabilities(self, stage: str) -> Dict[str, Any]:
+        """Get a stage's backend capabilities, resolved once per turn.
+
+        Clients cache successful probes per model; this also spares a turn
+        from asking twice while the backend cannot be probed.
+        """
+        target = self._stage_target(stage)
+        capabilities = self._turn_capabilities.get(target)
+        if capabilities is None:
+            capabilities = self._get_llm_client(stage).capabilities(self._stage_model(stage))
+            self._turn_capabilities[target] = capabilities
+        return capabilities
+
+    def _should_escalate(self, tool_calls: Optional[List[Dict[str, Any]]], malformed: bool,
+                         tools: Optional[List[Dict[str, Any]]]) -> bool:
+        """Whether tool selection should be retried on the answer model.
+
+        Applies when the tool stage runs on a different model or endpoint and
+        its output had a call that could not be parsed or names an unknown tool.
+        """
+        if not self.config['llm_escalation_enabled'] or self._stage_target("tool") == self._stage_target("answer"):
+            return False
+        if malformed and not tool_calls:
+            return True
+        offered = {tool["function"]["name"] for tool in tools or []}
+        return any(tc["function"]["name"] not in offered for tc in tool_calls or [])
+
+    def _stream_first_completion(self, messages: List[Dict[str, Any]],
+                                 tools: Optional[List[Dict[str, Any]]] = None,
+                                 stage: str = "tool") -> Iterator[str]:
+        """Streaming variant of the first completion; tool calls arrive as text."""
+        client = self._get_llm_client(stage)
+
+        return client.chat_stream(
+            messages=self._with_tool_prompt(messages, tools),
+            model=self._stage_model(stage),
+            temperature=0.7,
+            max_tokens=2048,
+            cache=self.config['llm_cache_mode'] == "always"
+        )
 
-        # For models that don't support native tool calling, add tool descriptions to messages
+    def _with_tool_prompt(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]],
+                          structured: bool = False) -> List[Dict[str, Any]]:
+        """Add tool descriptions for models that don't support native tool calling."""
         messages_for_llm = messages.copy()
         if tools:
-            tool_descriptions = self._build_tool_descriptions(tools)
+            # Built once per distinct tool list and reused across turns
             messages_for_llm.insert(0, {
                 "role": "system",
-                "content": f"You have access to the following tools:\n{tool_descriptions}\n\nIMPORTANT: You must use the appropriate tool to answer questions. Do not provide information from your training data. When you need to use a tool, respond ONLY with: <|start|>assistant<|channel|>commentary to=functions.{{tool_name}} <|constrain|>json<|message|>{{json_arguments}}"
+                "content": get_tool_prompt(tools, structured)
             })
+        return messages_for_llm
 
-        client = get_llm_client(
-            self.config['llm_api_flavor'],
-            self.config['llm_base_url'],
-            self.config['llm_port']
-        )
-
-        # Use prompting for tool calling
-        result = client.chat(
-            messages=messages_for_llm,
-            model=self.config['llm_default_model'],
-            temperature=0.7,
-            max_tokens=2048
-        )
-        result = self._parse_tool_calls_from_response(result)
-
-        print(f"DEBUG: First completion result has tool_calls: {'tool_calls' in result}")
-        if 'tool_calls' in result:
-            print(f"DEBUG: Tool calls count: {len(result['tool_calls'])}")
-
-        return result
-
-    def _second_completion(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
-        """Second completion for formatting with tool_choice='none'."""
-        client = get_llm_client(
-            self.config['llm_api_flavor'],
-            self.config['llm_base_url'],
-            self.config['llm_port']
-        )
+    def _stream_second_completion(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> Iterator[str]:
+        """Streaming variant of the formatting completion."""
+        client = self._get_llm_client("answer")
 
-        return client.chat_with_tools(
+        return client.chat_stream(
             messages=messages,
-            model=self.config['llm_default_model'],
+            model=self._stage_model("answer"),
             temperature=0.7,
             max_tokens=2048,
+            cache=self.config['llm_cache_mode'] == "always",
             tools=tools,
             tool_choice="none"
         )
 
-    def _execute_tools(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Execute MCP tools and return results."""
-        results = []
-        for tool_call in tool_calls:
+    def _iter_tool_events(self, tool_calls: List[Dict[str, Any]],
+                          prefetched: Optional[Dict[str, Future]] = None) -> Iterator[Dict[str, Any]]:
+        """Execute MCP tools concurrently, yielding progress and completion events by call index.
+
+        Events are tool_progress {"index", "progress", "total", "message"} as
+        the server reports progress, and tool_finished {"index", "result",
+        "elapsed"} as each call completes or misses its deadline. Calls
+        already started by the prefetcher are awaited instead of being sent again.
+        """
+        started = time.monotonic()
+        pending = {}
+        claimed = set()
+        # Worker threads report progress and completion here, so the caller's thread yields both in order
+        updates: "queue.Queue[Any]" = queue.Queue()
+        to_send = []
+        for index, tool_call in enumerate(tool_calls):
+            timeout = self.tool_timeouts.get(tool_call["function"]["name"], MCP_TOOL_TIMEOUT)
+            future = self.prefetcher.claim(prefetched, tool_call)
+            if future is not None:
+                logger.info(f"Using prefetched result for {tool_call['function']['name']}")
+                claimed.add(future)
+            else:
+                # Completed by the worker that sends the call, alone or in a batch
+                future = Future()
+                to_send.append((index, tool_call, timeout, future))
+            pending[future] = (index, tool_call, started + timeout)
+            future.add_done_callback(updates.put)
+
+        # A batch's results all arrive with its slowest call, so only calls sharing a deadline are batched
+        batches = [[call] for call in to_send]
+        if self.mcp_client.batch_supported:
+            by_timeout: Dict[float, List[Tuple[int, Dict[str, Any], float, Future]]] = {}
+            for call in to_send:
+                by_timeout.setdefault(call[2], []).append(call)
+            batches = list(by_timeout.values())
+        for batch in batches:
+            calls = [(tool_call, timeout, future, lambda params, index=index: updates.put((index, params)))
+                     for index, tool_call, timeout, future in batch]
+            if MCP_ASYNC_CLIENT:
+                # Runs on the shared event loop instead of holding a worker thread per call
+                submit_coroutine(self._aexecute_tool_batch(calls))
+            else:
+                _tool_executor.submit(self._execute_tool_batch, calls)
+
+        while pending:
+            next_deadline = min(deadline for _, _, deadline in pending.values())
+            try:
+                update = updates.get(timeout=max(0.0, next_deadline - time.monotonic()))
+            except queue.Empty:
+                update = None
+            now = time.monotonic()
+            if isinstance(update, tuple):
+                index, params = update
+                if any(index == pending_index for pending_index, _, _ in pending.values()):
+                    yield {"type": "tool_progress", "index": index, "progress": params.get("progress"),
+                           "total": params.get("total"), "message": params.get("message")}
+            elif update in pending:
+                index, tool_call, _ = pending.pop(update)
+                if update in claimed:
+                    result = self._prefetched_result(tool_call, update)
+                else:
+                    result = update.result()
+                yield {"type": "tool_finished", "index": index, "result": result, "elapsed": now - started}
+
+            for future, (index, tool_call, deadline) in list(pending.items()):
+                if deadline > now:
+                    continue
+                # A queued call is dropped; a running one is abandoned and ends at its HTTP timeout
+                del pending[future]
+                future.cancel()
+                timeout = deadline - started
+                logger.error(f"Tool {tool_call['function']['name']} missed its {timeout:g}s deadline")
+                yield {"type": "tool_finished", "index": index, "elapsed": now - started,
+                       "result": self._tool_error_result(tool_call, f"Tool timed out after {timeout:g}s")}
+
+    def _execute_tool(self, tool_call: Dict[str, Any], timeout: float,
+                      on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Execute a single MCP tool call."""
+        try:
+            result = self.mcp_client.call_tool(
+                tool_call["function"]["name"],
+                json.loads(tool_call["function"]["arguments"]),
+                timeout=timeout,
+                on_progress=on_progress
+            )
+            return self._tool_result(tool_call, result)
+        except Exception as e:
+            logger.error(f"Tool execution failed: {e}")
+            return self._tool_error_result(tool_call, str(e))
+
+    def _execute_tool_batch(self, calls: List[Tuple[Dict[str, Any], float, Future,
+                                                    Callable[[Dict[str, Any]], None]]]):
+        """Execute (tool_call, timeout, future, on_progress) calls, completing each future with its result."""
+        # Calls dropped at their deadline before starting are skipped
+        calls = [call for call in calls if call[2].set_running_or_notify_cancel()]
+        if len(calls) == 1:
+            tool_call, timeout, future, on_progress = calls[0]
+            future.set_result(self._execute_tool(tool_call, timeout, on_progress))
+            return
+
+        to_send = []
+        for tool_call, timeout, future, on_progress in calls:
             try:
-                result = self.mcp_client.call_tool(
-                    tool_call["function"]["name"],
-                    json.loads(tool_call["function"]["arguments"])
-                )
-                results.append({
-                    "tool_call_id": tool_call["id"],
-                    "content": json.dumps(result, ensure_ascii=False),
-                    "success": result.get("status") in ["success", "queued", "sent"]
-                })
-            except Exception as e:
+                to_send.append((tool_call, json.loads(tool_call["function"]["arguments"]), timeout, future, on_progress))
+            except json.JSONDecodeError as e:
                 logger.error(f"Tool execution failed: {e}")
-                results.append({
-                    "tool_call_id": tool_call["id"],
-                    "content": json.dumps({
-                        "status": "error",
-                        "message": str(e)
-                    }, ensure_ascii=False),
-                    "success": False
-                })
-        return results
+                future.set_result(self._tool_error_result(tool_call, str(e)))
+        if not to_send:
+            return
+
+        try:
+            results = self.mcp_client.call_tools_batch(
+                [(tool_call["function"]["name"], arguments) for tool_call, arguments, _, _, _ in to_send],
+                timeout=max(timeout for _, _, timeout, _, _ in to_send),
+                on_progress=[on_progress for _, _, _, _, on_progress in to_send]
+            )
+        except Exception as e:
+            logger.error(f"Tool execution failed: {e}")
+            for tool_call, _, _, future, _ in to_send:
+                future.set_result(self._tool_error_result(tool_call, str(e)))
+            return
+        for (tool_call, _, _, future, _), result in zip(to_send, results):
+            future.set_result(self._batch_tool_result(tool_call, result))
+
+    async def _aexecute_tool_batch(self, calls: List[Tuple[Dict[str, Any], float, Future,
+                                                           Callable[[Dict[str, Any]], None]]]):
+        """Async counterpart of _execute_tool_batch() using the async MCP client."""
+        calls = [call for call in calls if call[2].set_running_or_notify_cancel()]
+        to_send = []
+        for tool_call, timeout, future, on_progress in calls:
+            try:
+                to_send.append((tool_call, json.loads(tool_call["function"]["arguments"]), timeout, future, on_progress))
+            except json.JSONDecodeError as e:
+                logger.error(f"Tool execution failed: {e}")
+                future.set_result(self._tool_error_result(tool_call, str(e)))
+        if not to_send:
+            return
+
+        try:
+            results = await self.mcp_client.acall_tools_batch(
+                [(tool_call["function"]["name"], arguments) for tool_call, arguments, _, _, _ in to_send],
+                timeout=max(timeout for _, _, timeout, _, _ in to_send),
+                on_progress=[on_progress for _, _, _, _, on_progress in to_send]
+            )
+        except Exception as e:
+            logger.error(f"Tool execution failed: {e}")
+            for tool_call, _, _, future, _ in to_send:
+                future.set_result(self._tool_error_result(tool_call, str(e)))
+            return
+        for (tool_call, _, _, future, _), result in zip(to_send, results):
+            future.set_result(self._batch_tool_result(tool_call, result))
+
+    def _batch_tool_result(self, tool_call: Dict[str, Any], result: Any) -> Dict[str, Any]:
+        """Build the result for a batched call, so an unusable result still completes its future."""
+        try:
+            return self._tool_result(tool_call, result)
+        except Exception as e:
+            logger.error(f"Tool execution failed: {e}")
+            return self._tool_error_result(tool_call, str(e))
+
+    def _prefetched_result(self, tool_call: Dict[str, Any], future: Future) -> Dict[str, Any]:
+        """Build the result for a tool call answered by a prefetch."""
+        try:
+            return self._tool_result(tool_call, future.result())
+        except Exception as e:
+            logger.error(f"Prefetched tool execution failed: {e}")
+            return self._tool_error_result(tool_call, str(e))
+
+    def _tool_result(self, tool_call: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the result reported for a completed tool call."""
+        return {
+            "tool_call_id": tool_call["id"],
+            "content": json.dumps(result, ensure_ascii=False),
+            "success": result.get("status") in ["success", "queued", "sent"]
+        }
+
+    def _tool_error_result(self, tool_call: Dict[str, Any], message: str) -> Dict[str, Any]:
+        """Build the result reported for a failed tool call."""
+        return {
+            "tool_call_id": tool_call["id"],
+            "content": json.dumps({
+                "status": "error",
+                "message": message
+            }, ensure_ascii=False),
+            "success": False
+        }
 
     def _should_continue_chain(self, tool_results: List[Dict[str, Any]]) -> bool:
         """Determine if tool chain should continue based on results."""
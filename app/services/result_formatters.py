@@ -0,0 +1,121 @@
+import json
+from typing import Dict, Any, List, Optional, Callable
+from utils.translator import translator
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# A formatter turns one successful tool result into Markdown for a language
+ResultFormatter = Callable[[Dict[str, Any], Optional[str]], str]
+
+_formatters: Dict[str, ResultFormatter] = {}
+
+SUCCESS_STATUSES = ("success", "queued", "sent")
+
+
+def register_formatter(result_type: str, formatter: Optional[ResultFormatter] = None):
+    """Register a formatter for a tool ``result_type``; usable as a decorator."""
+    def register(func: ResultFormatter) -> ResultFormatter:
+        _formatters[result_type] = func
+        return func
+
+    if formatter is not None:
+        return register(formatter)
+    return register
+
+
+def get_formatter(result_type: str) -> Optional[ResultFormatter]:
+    """Get the registered formatter for a result type."""
+    return _formatters.get(result_type)
+
+
+def format_tool_results(tool_results: List[Dict[str, Any]], lang: Optional[str] = None) -> Optional[str]:
+    """Render tool results as the final answer without an LLM call.
+
+    Returns None unless every result succeeded and has a registered
+    formatter, in which case the caller should fall back to the LLM.
+    """
+    if not tool_results:
+        return None
+
+    sections = []
+    for tool_result in tool_results:
+        if not tool_result.get("success"):
+            return None
+        try:
+            result = json.loads(tool_result["content"])
+        except (KeyError, TypeError, json.JSONDecodeError):
+            return None
+        if not isinstance(result, dict) or result.get("status") not in SUCCESS_STATUSES:
+            return None
+        formatter = get_formatter(result.get("result_type", ""))
+        if formatter is None:
+            return None
+        try:
+            sections.append(formatter(result, lang))
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Formatter for {result.get('result_type')} failed, using LLM: {e}")
+            return None
+
+    return "\n\n".join(sections)
+
+
+def _template(name: str, lang: Optional[str]) -> str:
+    return translator.get(f"result_templates.{name}", lang=lang)
+
+
+def _value(value: Any, lang: Optional[str]) -> str:
+    if value is None or value == "" or value == []:
+        return _template("not_provided", lang)
+    return str(value)
+
+
+@register_formatter("expedite_email")
+def format_expedite_email(result: Dict[str, Any], lang: Optional[str] = None) -> str:
+    """Confirmation table and email preview for a queued or sent expedite request."""
+    data = result.get("data") or {}
+    preview = result.get("preview") or {}
+    items = ", ".join(f"{item.get('name', '?')} × {item.get('quantity', 1)}" for item in data.get("items") or [])
+    body_lines = [line for line in (preview.get("body") or "").splitlines() if line.strip()][:3]
+
+    text = _template(f"expedite_email_{result['status']}", lang) or _template("expedite_email_queued", lang)
+    text += "\n\n" + _template("expedite_email", lang).format(
+        po_number=_value(data.get("po_number"), lang),
+        supplier=_value(data.get("supplier_email"), lang),
+        items=_value(items, lang),
+        ship_date=_value(data.get("expected_ship_date"), lang),
+        message_id=_value(result.get("message_id"), lang)
+    )
+    if preview:
+        quoted = "  \n> ".join(body_lines + ["…"])
+        text += "\n\n" + _template("email_preview", lang).format(subject=_value(preview.get("subject"), lang))
+        text += f"\n\n> {quoted}"
+    return text
+
+
+@register_formatter("order_status")
+def format_order_status(result: Dict[str, Any], lang: Optional[str] = None) -> str:
+    """One-line order status with the estimated delivery date if known."""
+    data = result.get("data") or {}
+    status = data.get("status", "")
+    text = _template("order_status", lang).format(
+        po_number=_value(data.get("po_number"), lang),
+        status=translator.get(f"result_templates.order_statuses.{status}", _value(status, lang), lang=lang)
+    )
+    if data.get("estimated_delivery"):
+        text += _template("order_delivery", lang).format(date=data["estimated_delivery"])
+    return text
+
+
+@register_formatter("product_details")
+def format_product_details(result: Dict[str, Any], lang: Optional[str] = None) -> str:
+    """Product card with price and stock."""
+    data = result.get("data") or {}
+    return _template("product_details", lang).format(
+        name=_value(data.get("name"), lang),
+        sku=_value(data.get("sku"), lang),
+        description=_value(data.get("description"), lang),
+        price=_value(data.get("price"), lang),
+        stock=_value(data.get("stock"), lang),
+        category=_value(data.get("category"), lang)
+    )
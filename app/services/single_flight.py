@@ -0,0 +1,113 @@
+import asyncio
+import copy
+import threading
+from typing import Dict, Any, Callable, Awaitable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """An in-flight call that followers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+        # Set instead of done/result/error for async calls
+        self.future: Optional["asyncio.Future"] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one upstream call.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait and receive a copy of the same result (or exception).
+    If anyone joined, the first caller gets a copy too, so it can change its
+    result while the others are still copying theirs. Nothing is cached
+    once the call completes.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[Tuple[int, str], _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {"executed": 0, "shared": 0}
+
+    def do(self, key: str, func: Callable[[], T]) -> T:
+        """Run func once for all concurrent callers with the same key."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self._stats["shared"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["executed"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        # No followers can join once the call is unregistered
+        return copy.deepcopy(call.result) if call.followers else call.result
+
+    async def ado(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """Async counterpart of do(); coalesces calls on the same event loop."""
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        with self._lock:
+            call = self._async_calls.get(loop_key)
+            if call is not None:
+                call.followers += 1
+                self._stats["shared"] += 1
+                leader = False
+            else:
+                call = _Call()
+                call.future = loop.create_future()
+                self._async_calls[loop_key] = call
+                self._stats["executed"] += 1
+                leader = True
+        future = call.future
+
+        if not leader:
+            # Shield so a cancelled follower does not cancel the leader's result
+            result = await asyncio.shield(future)
+            return copy.deepcopy(result)
+
+        try:
+            result = await func()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark retrieved so an unawaited future does not log a warning
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            # Followers are woken later on this loop, so the count is final
+            return copy.deepcopy(result) if call.followers else result
+        finally:
+            with self._lock:
+                del self._async_calls[loop_key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get counts of executed and coalesced calls."""
+        with self._lock:
+            return dict(self._stats)
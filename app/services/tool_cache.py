@@ -0,0 +1,128 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from utils.config import parse_tool_seconds
+from utils.hashing import canonical_hash
+from utils.logging import get_logger
+from config.constants import MCP_TOOL_CACHE_TTL, MCP_TOOL_CACHE_TTLS, MCP_TOOL_CACHE_MAX_ENTRIES
+
+logger = get_logger(__name__)
+
+
+class ToolResultCache:
+    """TTL cache for results of read-only MCP tools.
+
+    A tool is cached only when it is known to be free of side effects:
+    either it has a TTL in ``MCP_TOOL_CACHE_TTLS`` or the server marks it
+    with the ``readOnlyHint`` annotation. A TTL of 0 disables caching for a
+    tool, and tools marked destructive are never cached.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = MCP_TOOL_CACHE_TTL,
+                 max_entries: int = MCP_TOOL_CACHE_MAX_ENTRIES):
+        self.ttls = dict(ttls if ttls is not None else parse_tool_seconds(MCP_TOOL_CACHE_TTLS))
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._annotations: Dict[str, Dict[str, Any]] = {}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "invalidations": 0}
+        self._tool_stats: Dict[str, Dict[str, int]] = {}
+
+    def update_metadata(self, tools: List[Dict[str, Any]]):
+        """Record tool annotations from an MCP tools/list result."""
+        with self._lock:
+            for tool in tools:
+                if tool.get("name"):
+                    self._annotations[tool["name"]] = tool.get("annotations") or {}
+
+    def is_read_only(self, tool_name: str) -> bool:
+        """Whether a tool is known to be free of side effects."""
+        with self._lock:
+            annotations = self._annotations.get(tool_name, {})
+        if annotations.get("destructiveHint") is True:
+            return False
+        return tool_name in self.ttls or annotations.get("readOnlyHint") is True
+
+    def ttl_for(self, tool_name: str) -> float:
+        """Get the cache TTL for a tool; 0 means the tool is not cached."""
+        if not self.is_read_only(tool_name):
+            return 0
+        return max(0.0, self.ttls.get(tool_name, self.default_ttl))
+
+    @staticmethod
+    def make_key(namespace: str, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Build a key from the server, tool name and canonicalized arguments."""
+        return canonical_hash([namespace, tool_name, arguments])
+
+    def get(self, tool_name: str, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached tool result, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] <= time.time():
+                del self._entries[key]
+                entry = None
+
+            counters = self._tool_stats.setdefault(tool_name, {"hits": 0, "misses": 0})
+            if entry is None:
+                self._stats["misses"] += 1
+                counters["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            counters["hits"] += 1
+            return copy.deepcopy(entry["value"])
+
+    def set(self, tool_name: str, key: str, value: Dict[str, Any], ttl: float):
+        """Store a tool result for ttl seconds."""
+        entry = {"tool": tool_name, "expires_at": time.time() + ttl, "value": copy.deepcopy(value)}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stats["writes"] += 1
+
+    def invalidate(self, tool_name: Optional[str] = None, key: Optional[str] = None) -> int:
+        """Drop cached results for one key, one tool, or everything; returns the count removed."""
+        with self._lock:
+            if key is not None:
+                removed = 1 if self._entries.pop(key, None) is not None else 0
+            elif tool_name is not None:
+                keys = [k for k, entry in self._entries.items() if entry["tool"] == tool_name]
+                for k in keys:
+                    del self._entries[k]
+                removed = len(keys)
+            else:
+                removed = len(self._entries)
+                self._entries.clear()
+            self._stats["invalidations"] += removed
+        if removed:
+            logger.info(f"Invalidated {removed} cached tool result(s)")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters overall and per tool."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["by_tool"] = {name: dict(counters) for name, counters in self._tool_stats.items()}
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_tool_result_cache: Optional[ToolResultCache] = None
+_tool_result_cache_lock = threading.Lock()
+
+
+def get_tool_result_cache() -> ToolResultCache:
+    """Get the process-wide tool result cache."""
+    global _tool_result_cache
+    with _tool_result_cache_lock:
+        if _tool_result_cache is None:
+            _tool_result_cache = ToolResultCache()
+        return _tool_result_cache
@@ -0,0 +1,324 @@
+import hashlib
+import json
+import re
+from typing import List, Dict, Any, Optional, Tuple
+
+# Harmony-style call header: <|start|>assistant<|channel|>commentary to=functions.{name} <|constrain|>json<|message|>{args}
+_HEADER_PREFIXES = (
+    "<|start|>assistant<|channel|>commentary to=functions.",
+    "<|channel|>commentary to=functions.",
+)
+_MESSAGE_MARKER = "<|message|>"
+# Tokens that close a harmony message; dropped from the visible content
+_CONTROL_TOKENS = ("<|call|>", "<|end|>", "<|return|>")
+# Longest stretch allowed between the tool name and <|message|>
+_MAX_HEADER_GAP = 64
+
+_NAME_RE = re.compile(r"[\w.\-]*")
+_JSON_TOOL_RE = re.compile(r'\{\s*"tool"\s*:\s*"([^"]+)"')
+
+_TEXT, _HEADER, _ARGS, _JSON = "text", "header", "args", "json"
+_WAIT = object()
+
+
+def make_call_id(index: int, name: str, arguments: str) -> str:
+    """Build a call ID that is stable for the same call across processes."""
+    digest = hashlib.sha1(f"{index}:{name}:{arguments}".encode("utf-8")).hexdigest()
+    return f"call_{digest[:16]}"
+
+
+class ToolCallParser:
+    """Incremental parser for tool calls written into model output.
+
+    Recognises harmony-style call headers and the ``{"tool": ..., "arguments": ...}``
+    JSON fallback, any number of times per message. Text is fed in chunks as
+    it streams in; ``detected`` turns true as soon as a call header is seen so
+    callers can stop generating prose, and completed calls are returned from
+    ``feed()`` in OpenAI ``tool_calls`` format. Harmony calls whose arguments
+    are not valid JSON are kept as text and listed in ``unparsed_calls`` as
+    {"name", "arguments"} so they can be repaired.
+    """
+
+    def __init__(self):
+        self.tool_calls: List[Dict[str, Any]] = []
+        self.unparsed_calls: List[Dict[str, str]] = []
+        self.detected = False
+        self.pending_name: Optional[str] = None
+        self._buffer = ""
+        self._pos = 0
+        # Characters dropped from the front of the buffer, for absolute positions
+        self._trimmed = 0
+        self._last_unparsed = -1
+        self._state = _TEXT
+        self._finished = False
+        self._text: List[str] = []
+        self._unread: List[str] = []
+        # Start of the construct being parsed and the name from its header
+        self._start = 0
+        self._name = ""
+        # Brace scanner state for the JSON object being read
+        self._obj_start = 0
+        self._scan_pos = 0
+        self._depth = 0
+        self._in_string = False
+        # token -> (next index or -1, buffer length searched); see _find()
+        self._finds: Dict[str, Tuple[int, int]] = {}
+
+    @property
+    def content(self) -> str:
+        """All prose outside tool calls seen so far."""
+        return "".join(self._text).strip()
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Add streamed text and return the tool calls it completed."""
+        if self._state == _TEXT and self._pos:
+            # Prose already emitted is not needed again; keep the buffer short
+            self._buffer = self._buffer[self._pos:]
+            self._trimmed += self._pos
+            self._pos = 0
+            self._finds = {}
+        if self._state == _TEXT and not self._buffer and "<" not in chunk and "{" not in chunk:
+            # Plain prose chunk: nothing to parse
+            self._emit_text(chunk)
+            return []
+        self._buffer += chunk
+        return self._process()
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Mark the end of output; incomplete calls are kept as text."""
+        self._finished = True
+        completed = self._process()
+        if self._state == _ARGS and self._obj_start != -1:
+            # Output ended inside the arguments object
+            self._add_unparsed(len(self._buffer))
+        start = self._pos if self._state == _TEXT else self._start
+        self._emit_text(self._buffer[start:])
+        self._pos = len(self._buffer)
+        self._state = _TEXT
+        self.pending_name = None
+        return completed
+
+    def take_text(self) -> str:
+        """Return prose that is safe to display and was not returned before."""
+        text = "".join(self._unread)
+        self._unread = []
+        return text
+
+    def _emit_text(self, text: str):
+        if text:
+            self._text.append(text)
+            self._unread.append(text)
+
+    def _add_call(self, name: str, arguments: Any) -> Dict[str, Any]:
+        if not isinstance(arguments, str):
+            arguments = json.dumps(arguments, ensure_ascii=False)
+        call = {
+            "id": make_call_id(len(self.tool_calls), name, arguments),
+            "type": "function",
+            "function": {"name": name, "arguments": arguments}
+        }
+        self.tool_calls.append(call)
+        self.pending_name = None
+        return call
+
+    def _add_unparsed(self, end: int):
+        # A header inside an abandoned call can match again; record each object once
+        start = self._trimmed + self._obj_start
+        if start > self._last_unparsed:
+            self._last_unparsed = start
+            self.unparsed_calls.append({"name": self._name, "arguments": self._buffer[self._obj_start:end]})
+
+    def _start_object(self, start: int):
+        self._obj_start = start
+        self._scan_pos = start
+        self._depth = 0
+        self._in_string = False
+
+    def _find(self, token: str, pos: int) -> int:
+        """Find token at or after pos, remembering results so no text is searched twice.
+
+        Positions only move forward between resets, so a cached hit past pos is
+        still the next occurrence and a cached miss only needs the new text searched.
+        """
+        found, searched = self._finds.get(token, (-1, 0))
+        if found >= pos:
+            return found
+        start = pos if found != -1 else max(pos, searched - len(token) + 1)
+        found = self._buffer.find(token, start)
+        self._finds[token] = (found, len(self._buffer))
+        return found
+
+    def _scan_object(self) -> Optional[int]:
+        """Advance the brace scanner; return the object's end index once it closes."""
+        pos = self._scan_pos
+        while True:
+            if self._in_string:
+                quote = self._find('"', pos)
+                escape = self._find("\\", pos)
+                if escape != -1 and (quote == -1 or escape < quote):
+                    if escape + 1 >= len(self._buffer):
+                        # Escape split across chunks; rescan it next time
+                        self._scan_pos = escape
+                        return None
+                    pos = escape + 2
+                    continue
+                if quote == -1:
+                    self._scan_pos = len(self._buffer)
+                    return None
+                self._in_string = False
+                pos = quote + 1
+                continue
+
+            found = [i for i in (self._find('"', pos), self._find("{", pos), self._find("}", pos)) if i != -1]
+            if not found:
+                self._scan_pos = len(self._buffer)
+                return None
+            index = min(found)
+            pos = index + 1
+            char = self._buffer[index]
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._scan_pos = pos
+                    return pos
+
+    def _match_marker(self, i: int) -> Any:
+        """Classify the ``<|`` at index i: a header, a control token, text or _WAIT."""
+        buffer = self._buffer
+        for prefix in _HEADER_PREFIXES:
+            segment = buffer[i:i + len(prefix)]
+            if segment != prefix:
+                if len(segment) < len(prefix) and prefix.startswith(segment) and not self._finished:
+                    return _WAIT
+                continue
+            name = _NAME_RE.match(buffer, i + len(prefix))
+            if name.end() == len(buffer) and not self._finished:
+                return _WAIT
+            if name.group():
+                return "header", name.group(), name.end()
+        for token in _CONTROL_TOKENS:
+            segment = buffer[i:i + len(token)]
+            if segment == token:
+                return "control", None, i + len(token)
+            if token.startswith(segment) and not self._finished:
+                return _WAIT
+        return None
+
+    def _process(self) -> List[Dict[str, Any]]:
+        completed = []
+        buffer = self._buffer
+        while self._pos < len(buffer):
+            if self._state == _TEXT:
+                stops = [i for i in (self._find("<|", self._pos), self._find("{", self._pos)) if i != -1]
+                if not stops:
+                    end = len(buffer)
+                    # A lone trailing "<" may be the start of a marker
+                    if buffer.endswith("<") and not self._finished:
+                        end -= 1
+                    self._emit_text(buffer[self._pos:end])
+                    self._pos = end
+                    break
+
+                stop = min(stops)
+                self._emit_text(buffer[self._pos:stop])
+                self._pos = stop
+                if buffer[stop] == "{":
+                    self._state = _JSON
+                    self._start = self._pos
+                    self._start_object(self._pos)
+                    continue
+
+                marker = self._match_marker(self._pos)
+                if marker is _WAIT:
+                    break
+                if marker is None:
+                    self._emit_text("<|")
+                    self._pos += 2
+                    continue
+                kind, name, end = marker
+                if kind == "header":
+                    self._state = _HEADER
+                    self._start = self._pos
+                    self._name = name
+                    self.detected = True
+                    self.pending_name = name
+                self._pos = end
+
+            elif self._state == _HEADER:
+                index = buffer.find(_MESSAGE_MARKER, self._pos)
+                if index == -1 or index - self._pos > _MAX_HEADER_GAP:
+                    if index == -1 and len(buffer) - self._pos <= _MAX_HEADER_GAP and not self._finished:
+                        break
+                    self._abandon()
+                    continue
+                self._state = _ARGS
+                self._pos = index + len(_MESSAGE_MARKER)
+                self._obj_start = -1
+
+            elif self._state == _ARGS:
+                if self._obj_start == -1:
+                    start = len(buffer) - len(buffer[self._pos:].lstrip())
+                    if start == len(buffer):
+                        self._pos = len(buffer)
+                        break
+                    if buffer[start] != "{":
+                        self._abandon()
+                        continue
+                    self._start_object(start)
+                end = self._scan_object()
+                if end is None:
+                    self._pos = len(buffer)
+                    break
+                try:
+                    arguments = json.loads(buffer[self._obj_start:end])
+                except json.JSONDecodeError:
+                    self._add_unparsed(end)
+                    self._abandon()
+                    continue
+                completed.append(self._add_call(self._name, arguments))
+                self._state = _TEXT
+                self._pos = end
+
+            else:
+                if self.pending_name is None:
+                    header = _JSON_TOOL_RE.match(buffer, self._obj_start)
+                    if header is not None:
+                        self.detected = True
+                        self.pending_name = header.group(1)
+                end = self._scan_object()
+                if end is None:
+                    self._pos = len(buffer)
+                    break
+                self._state = _TEXT
+                self._pos = end
+                try:
+                    candidate = json.loads(buffer[self._obj_start:end])
+                except json.JSONDecodeError:
+                    candidate = None
+                if isinstance(candidate, dict) and isinstance(candidate.get("tool"), str) and "arguments" in candidate:
+                    completed.append(self._add_call(candidate["tool"], candidate["arguments"]))
+                else:
+                    self.pending_name = None
+                    self._emit_text(buffer[self._obj_start:end])
+        return completed
+
+    def _abandon(self):
+        """Give up on a malformed harmony call and keep its header as text."""
+        self._emit_text(self._buffer[self._start:self._start + 2])
+        self._pos = self._start + 2
+        self._state = _TEXT
+        # The position moved back, so cached search results are no longer valid
+        self._finds = {}
+        self.pending_name = None
+
+
+def parse_tool_calls(content: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """Parse complete model output into (remaining content, tool calls)."""
+    parser = ToolCallParser()
+    parser.feed(content)
+    parser.finish()
+    return parser.content, parser.tool_calls
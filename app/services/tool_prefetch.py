@@ -0,0 +1,124 @@
+import json
+import re
+import threading
+from concurrent.futures import Executor, Future
+from typing import List, Dict, Any, Optional, Callable, Pattern, Tuple
+from .tool_cache import get_tool_result_cache
+from utils.hashing import canonical_hash
+from utils.logging import get_logger
+from config.constants import TOOL_PREFETCH_PATTERNS, TOOL_PREFETCH_MAX_CALLS
+
+logger = get_logger(__name__)
+
+# (tool name, argument name, pattern)
+PrefetchRule = Tuple[str, str, Pattern]
+
+
+def parse_prefetch_patterns(spec: str) -> List[PrefetchRule]:
+    """Parse prefetch rules from a "tool:argument=regex;tool:argument=regex" string."""
+    rules = []
+    for entry in spec.split(';'):
+        target, _, pattern = entry.strip().partition('=')
+        tool_name, _, argument = target.partition(':')
+        if not (tool_name.strip() and argument.strip() and pattern):
+            continue
+        try:
+            rules.append((tool_name.strip(), argument.strip(), re.compile(pattern)))
+        except re.error as e:
+            logger.warning(f"Ignoring invalid prefetch pattern {entry}: {e}")
+    return rules
+
+
+class ToolPrefetcher:
+    """Start likely tool calls before the model asks for them.
+
+    Entities such as PO numbers or SKUs in the user turn map to read-only
+    tool calls, which run while the first completion is generated. When the
+    model then requests the same call, its result is taken from the prefetch;
+    prefetches the model never asks for are discarded.
+    """
+
+    def __init__(self, rules: Optional[List[PrefetchRule]] = None, max_calls: int = TOOL_PREFETCH_MAX_CALLS):
+        self.rules = rules if rules is not None else parse_prefetch_patterns(TOOL_PREFETCH_PATTERNS)
+        self.max_calls = max_calls
+        self._lock = threading.Lock()
+        self._stats = {"started": 0, "hits": 0, "wasted": 0}
+
+    @staticmethod
+    def call_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Key a call by tool name and canonicalized arguments."""
+        return canonical_hash([tool_name, arguments])
+
+    def detect(self, text: str, tools: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Get (tool name, arguments) pairs worth prefetching for a user turn."""
+        offered = {tool["function"]["name"] for tool in tools}
+        cache = get_tool_result_cache()
+        calls, seen = [], set()
+        for tool_name, argument, pattern in self.rules:
+            # Only tools offered this turn, and never one with side effects
+            if tool_name not in offered or not cache.is_read_only(tool_name):
+                continue
+            for match in pattern.finditer(text or ""):
+                value = match.group(1) if pattern.groups else match.group(0)
+                key = self.call_key(tool_name, {argument: value})
+                if key not in seen:
+                    seen.add(key)
+                    calls.append((tool_name, {argument: value}))
+        return calls[:self.max_calls]
+
+    def start(self, text: str, tools: List[Dict[str, Any]], executor: Executor,
+              call: Callable[[str, Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Future]:
+        """Submit the detected calls; returns in-flight futures keyed by call_key()."""
+        prefetched = {}
+        for tool_name, arguments in self.detect(text, tools):
+            logger.info(f"Prefetching {tool_name} with args: {arguments}")
+            prefetched[self.call_key(tool_name, arguments)] = executor.submit(call, tool_name, arguments)
+        if prefetched:
+            with self._lock:
+                self._stats["started"] += len(prefetched)
+        return prefetched
+
+    def claim(self, prefetched: Dict[str, Future], tool_call: Dict[str, Any]) -> Optional[Future]:
+        """Take the prefetch matching a tool call requested by the model, if any."""
+        if not prefetched:
+            return None
+        try:
+            arguments = json.loads(tool_call["function"]["arguments"])
+        except (json.JSONDecodeError, TypeError):
+            return None
+        future = prefetched.pop(self.call_key(tool_call["function"]["name"], arguments), None)
+        if future is not None:
+            with self._lock:
+                self._stats["hits"] += 1
+        return future
+
+    def discard(self, prefetched: Dict[str, Future]):
+        """Drop prefetches the model did not ask for."""
+        for future in prefetched.values():
+            future.cancel()
+        if prefetched:
+            logger.info(f"Discarding {len(prefetched)} unused prefetched tool call(s)")
+            with self._lock:
+                self._stats["wasted"] += len(prefetched)
+        prefetched.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get prefetch counters and the share of prefetches that were used."""
+        with self._lock:
+            stats = dict(self._stats)
+        settled = stats["hits"] + stats["wasted"]
+        stats["hit_rate"] = stats["hits"] / settled if settled else 0.0
+        return stats
+
+
+_tool_prefetcher: Optional[ToolPrefetcher] = None
+_tool_prefetcher_lock = threading.Lock()
+
+
+def get_tool_prefetcher() -> ToolPrefetcher:
+    """Get the process-wide tool prefetcher."""
+    global _tool_prefetcher
+    with _tool_prefetcher_lock:
+        if _tool_prefetcher is None:
+            _tool_prefetcher = ToolPrefetcher()
+        return _tool_prefetcher
@@ -0,0 +1,122 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Callable, Tuple, TypeVar
+from utils.hashing import canonical_hash
+
+T = TypeVar("T")
+
+TOOL_PROMPT_TEMPLATE = (
+    "You have access to the following tools:\n{descriptions}\n\n"
+    "IMPORTANT: You must use the appropriate tool to answer questions. Do not provide information from your "
+    "training data. When you need to use a tool, respond ONLY with: <|start|>assistant<|channel|>commentary "
+    "to=functions.{{tool_name}} <|constrain|>json<|message|>{{json_arguments}}"
+)
+
+# For backends that constrain output to a JSON schema; see tool_schemas.get_response_format()
+STRUCTURED_TOOL_PROMPT_TEMPLATE = (
+    "You have access to the following tools:\n{descriptions}\n\n"
+    "IMPORTANT: You must use the appropriate tool to answer questions. Do not provide information from your "
+    "training data. Reply with a JSON object: {{\"tool_calls\": [{{\"tool\": tool_name, \"arguments\": "
+    "{{...}}}}]}} to call tools, or {{\"answer\": text}} when no tool is needed."
+)
+
+REPAIR_PROMPT_TEMPLATE = (
+    "The arguments you gave for the tool {tool} are invalid:\n{errors}\n\n"
+    "The tool's parameters follow this JSON schema: {schema}\n"
+    "Reply ONLY with the corrected arguments as a JSON object."
+)
+
+
+def compact_json(obj: Any) -> str:
+    """Serialize without whitespace, keeping non-ASCII text readable (and short)."""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class ToolListCache:
+    """Cache of artefacts derived from a tool list, such as its prompt block.
+
+    Entries are keyed by a fingerprint of the list's content, so identical
+    tool lists share them across turns and sessions. The list object itself
+    is also remembered, so passing the same list again skips fingerprinting;
+    tool lists are therefore treated as immutable once built.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._by_identity: "OrderedDict[int, Tuple[List[Dict[str, Any]], str]]" = OrderedDict()
+        self._by_fingerprint: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def fingerprint(self, tools: List[Dict[str, Any]]) -> str:
+        """Get the content hash of a tool list."""
+        with self._lock:
+            known = self._by_identity.get(id(tools))
+            if known is not None and known[0] is tools:
+                self._by_identity.move_to_end(id(tools))
+                return known[1]
+
+        fingerprint = canonical_hash(tools)
+        with self._lock:
+            # Holding the list keeps its id from being reused by another object
+            self._by_identity[id(tools)] = (tools, fingerprint)
+            while len(self._by_identity) > self.max_entries:
+                self._by_identity.popitem(last=False)
+        return fingerprint
+
+    def get(self, tools: List[Dict[str, Any]], name: str, build: Callable[[List[Dict[str, Any]]], T]) -> T:
+        """Get the named artefact for a tool list, building it on first use."""
+        fingerprint = self.fingerprint(tools)
+        with self._lock:
+            artefacts = self._by_fingerprint.get(fingerprint)
+            if artefacts is not None and name in artefacts:
+                self._by_fingerprint.move_to_end(fingerprint)
+                self._stats["hits"] += 1
+                return artefacts[name]
+
+        value = build(tools)
+        with self._lock:
+            self._stats["misses"] += 1
+            self._by_fingerprint.setdefault(fingerprint, {})[name] = value
+            self._by_fingerprint.move_to_end(fingerprint)
+            while len(self._by_fingerprint) > self.max_entries:
+                self._by_fingerprint.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["tool_lists"] = len(self._by_fingerprint)
+        return stats
+
+
+tool_list_cache = ToolListCache()
+
+
+def _build_tool_prompt(tools: List[Dict[str, Any]], template: str = TOOL_PROMPT_TEMPLATE) -> str:
+    descriptions = []
+    for tool in tools:
+        func = tool["function"]
+        descriptions.append(f"- {func['name']}: {func.get('description', '')}\n"
+                            f"  Parameters: {compact_json(func.get('parameters', {}))}")
+    return template.format(descriptions="\n".join(descriptions))
+
+
+def get_tool_prompt(tools: List[Dict[str, Any]], structured: bool = False) -> str:
+    """Get the system prompt block describing tools for prompt-based tool calling.
+
+    Args:
+        tools: Tools in OpenAI format
+        structured: Ask for the JSON reply format used with schema-constrained output
+    """
+    if structured:
+        return tool_list_cache.get(tools, "structured_prompt",
+                                   lambda t: _build_tool_prompt(t, STRUCTURED_TOOL_PROMPT_TEMPLATE))
+    return tool_list_cache.get(tools, "prompt", _build_tool_prompt)
+
+
+def get_tools_json(tools: List[Dict[str, Any]]) -> str:
+    """Get the compact JSON of a tools array for splicing into request bodies."""
+    return tool_list_cache.get(tools, "json", compact_json)
@@ -0,0 +1,128 @@
+import math
+import re
+from collections import Counter
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from .tool_prompt import tool_list_cache
+from utils.logging import get_logger
+from config.constants import TOOL_ROUTER_TOP_K, TOOL_ROUTER_ALWAYS_INCLUDE, TOOL_ROUTER_PRESET_WEIGHT
+
+logger = get_logger(__name__)
+
+_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
+_TOKEN_RE = re.compile(r"[^\W_]+")
+# Tool names say the most about what a tool does
+_NAME_BOOST = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, breaking snake_case and camelCase apart."""
+    terms = []
+    for token in _TOKEN_RE.findall(_CAMEL_RE.sub(r"\1 \2", text or "").lower()):
+        if len(token) < 2:
+            continue
+        # Crude plural folding so "orders" matches "order"
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+
+class BM25Index:
+    """Okapi BM25 inverted index over tool names, descriptions and parameter names."""
+
+    def __init__(self, tools: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.tools = tools
+        self.k1 = k1
+        self.b = b
+        self.names = [tool["function"]["name"] for tool in tools]
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.lengths: List[int] = []
+        for index, tool in enumerate(tools):
+            terms = Counter(self._document_terms(tool))
+            self.lengths.append(sum(terms.values()))
+            for term, frequency in terms.items():
+                self.postings.setdefault(term, {})[index] = frequency
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        count = len(tools)
+        self.idf = {
+            term: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        # Subsets handed out before, so the same selection is the same list object
+        self._subsets: Dict[Tuple[int, ...], List[Dict[str, Any]]] = {}
+
+    @staticmethod
+    def _document_terms(tool: Dict[str, Any]) -> List[str]:
+        func = tool["function"]
+        properties = (func.get("parameters") or {}).get("properties") or {}
+        return (tokenize(func["name"]) * _NAME_BOOST
+                + tokenize(func.get("description", ""))
+                + [term for name in properties for term in tokenize(name)])
+
+    def score(self, query: Dict[str, float]) -> List[float]:
+        """Score every tool against weighted query terms."""
+        scores = [0.0] * len(self.tools)
+        for term, weight in query.items():
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = self.idf[term]
+            for index, frequency in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / (self.avg_length or 1))
+                scores[index] += weight * idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def subset(self, indexes: Iterable[int]) -> List[Dict[str, Any]]:
+        """Get the tools at the given indexes, in catalog order."""
+        key = tuple(sorted(set(indexes)))
+        subset = self._subsets.get(key)
+        if subset is None:
+            subset = [self.tools[i] for i in key]
+            self._subsets[key] = subset
+        return subset
+
+
+class ToolRouter:
+    """Pick the tools worth offering to the model for a turn.
+
+    Tools are ranked with BM25 against the user turn, plus the active
+    preset's text at a lower weight. The top-k are offered together with
+    tools pinned by the preset and the configured always-include list.
+    Catalogs no larger than k are passed through unchanged.
+    """
+
+    def __init__(self, top_k: int = TOOL_ROUTER_TOP_K, always_include: Optional[List[str]] = None,
+                 preset_weight: float = TOOL_ROUTER_PRESET_WEIGHT):
+        self.top_k = top_k
+        self.always_include = always_include if always_include is not None else [
+            name.strip() for name in TOOL_ROUTER_ALWAYS_INCLUDE.split(',') if name.strip()
+        ]
+        self.preset_weight = preset_weight
+
+    def select(self, tools: List[Dict[str, Any]], query: str, preset_text: str = "",
+               pinned: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get the subset of tools to offer for a user turn."""
+        if self.top_k <= 0 or len(tools) <= self.top_k:
+            return tools
+
+        index = tool_list_cache.get(tools, "bm25", BM25Index)
+        weights: Dict[str, float] = {}
+        for term in tokenize(preset_text):
+            weights[term] = weights.get(term, 0.0) + self.preset_weight
+        for term in tokenize(query):
+            weights[term] = weights.get(term, 0.0) + 1.0
+
+        scores = index.score(weights)
+        if not any(scores):
+            # Nothing to go on; hiding tools could make the turn fail
+            logger.info("No tool matched the turn, offering the full catalog")
+            return tools
+
+        required = set(self.always_include) | set(pinned or [])
+        selected = [i for i, name in enumerate(index.names) if name in required]
+        ranked = sorted((i for i in range(len(tools)) if scores[i] > 0 and i not in selected),
+                        key=lambda i: -scores[i])
+        selected.extend(ranked[:self.top_k])
+
+        logger.info(f"Tool router selected {len(selected)} of {len(tools)} tools")
+        return index.subset(selected)
@@ -0,0 +1,150 @@
+import json
+from typing import List, Dict, Any, Optional, Tuple
+from jsonschema import SchemaError
+from jsonschema.validators import validator_for
+from .tool_prompt import tool_list_cache
+from .tool_call_parser import make_call_id
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Errors reported per invalid call; the first few are enough to repair it
+_MAX_ERRORS = 5
+
+
+def input_schema(tool: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the JSON schema of a tool's arguments."""
+    return tool["function"].get("parameters") or {"type": "object"}
+
+
+def _build_validators(tools: List[Dict[str, Any]]) -> Dict[str, Any]:
+    validators = {}
+    for tool in tools:
+        schema = input_schema(tool)
+        cls = validator_for(schema)
+        try:
+            cls.check_schema(schema)
+        except SchemaError as e:
+            logger.warning(f"Not validating arguments of {tool['function']['name']}, its schema is invalid: {e.message}")
+            continue
+        validators[tool["function"]["name"]] = cls(schema)
+    return validators
+
+
+def validate_arguments(tools: List[Dict[str, Any]], tool_call: Dict[str, Any]) -> List[str]:
+    """Check a tool call's arguments against the tool's input schema.
+
+    Validators are compiled once per distinct tool list. Calls to tools
+    that are not in the list are not checked here.
+
+    Returns:
+        Error messages; empty when the arguments are valid
+    """
+    try:
+        arguments = json.loads(tool_call["function"].get("arguments") or "{}")
+    except (json.JSONDecodeError, TypeError) as e:
+        return [f"arguments are not valid JSON: {e}"]
+    if not isinstance(arguments, dict):
+        return ["arguments must be a JSON object"]
+
+    validator = tool_list_cache.get(tools, "validators", _build_validators).get(tool_call["function"]["name"])
+    if validator is None:
+        return []
+    errors = []
+    for error in validator.iter_errors(arguments):
+        path = "/".join(str(part) for part in error.absolute_path) or "(root)"
+        errors.append(f"{path}: {error.message}")
+        if len(errors) >= _MAX_ERRORS:
+            break
+    return errors
+
+
+def _build_response_format(tools: List[Dict[str, Any]]) -> Dict[str, Any]:
+    calls = [{
+        "type": "object",
+        "properties": {
+            "tool": {"type": "string", "enum": [tool["function"]["name"]]},
+            "arguments": input_schema(tool)
+        },
+        "required": ["tool", "arguments"],
+        "additionalProperties": False
+    } for tool in tools]
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "tool_selection",
+            "schema": {
+                "anyOf": [
+                    {
+                        "type": "object",
+                        "properties": {"tool_calls": {"type": "array", "minItems": 1, "items": {"anyOf": calls}}},
+                        "required": ["tool_calls"],
+                        "additionalProperties": False
+                    },
+                    {
+                        "type": "object",
+                        "properties": {"answer": {"type": "string"}},
+                        "required": ["answer"],
+                        "additionalProperties": False
+                    }
+                ]
+            }
+        }
+    }
+
+
+def get_response_format(tools: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Get the response_format that constrains a reply to tool calls with valid arguments, or an answer."""
+    return tool_list_cache.get(tools, "response_format", _build_response_format)
+
+
+def get_arguments_format(tool: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the response_format that constrains a reply to one tool's arguments."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "arguments", "schema": input_schema(tool)}
+    }
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Read a JSON object from model output, tolerating surrounding prose or code fences."""
+    text = (text or "").strip()
+    candidates = [text]
+    start, end = text.find("{"), text.rfind("}")
+    if 0 <= start < end:
+        candidates.append(text[start:end + 1])
+    for candidate in candidates:
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+def parse_structured_response(content: str) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+    """Read a reply written to get_response_format()'s schema.
+
+    Returns:
+        Tuple of (answer, tool calls in OpenAI format), or None if the
+        reply does not follow the schema
+    """
+    data = extract_json_object(content)
+    if data is None:
+        return None
+    if isinstance(data.get("answer"), str) and not data.get("tool_calls"):
+        return data["answer"], []
+
+    calls = data.get("tool_calls")
+    if not isinstance(calls, list) or not all(isinstance(c, dict) and isinstance(c.get("tool"), str) for c in calls):
+        return None
+    tool_calls = []
+    for index, call in enumerate(calls):
+        arguments = json.dumps(call.get("arguments", {}), ensure_ascii=False)
+        tool_calls.append({
+            "id": make_call_id(index, call["tool"], arguments),
+            "type": "function",
+            "function": {"name": call["tool"], "arguments": arguments}
+        })
+    return "", tool_calls
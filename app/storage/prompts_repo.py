@@ -23,6 +23,8 @@ class PromptsRepository:
                     'title': post.get('title', md_file.stem),
                     'category': post.get('category', 'General'),
                     'tags': post.get('tags', []),
+                    'response_mode': post.get('response_mode', 'default'),
+                    'tools': post.get('tools', []),
                     'filename': md_file.name,
                     'updated_at': post.get('updated_at', '')
                 })
@@ -42,6 +44,8 @@ class PromptsRepository:
                         'title': post.get('title', md_file.stem),
                         'category': post.get('category', 'General'),
                         'tags': post.get('tags', []),
+                        'response_mode': post.get('response_mode', 'default'),
+                        'tools': post.get('tools', []),
                         'content': post.content,
                         'filename': md_file.name
                     }
@@ -58,6 +62,8 @@ class PromptsRepository:
                 'title': prompt_data['title'],
                 'category': prompt_data.get('category', 'General'),
                 'tags': prompt_data.get('tags', []),
+                'response_mode': prompt_data.get('response_mode', 'default'),
+                'tools': prompt_data.get('tools', []),
                 'version': prompt_data.get('version', '1.0.0'),
                 'updated_at': prompt_data.get('updated_at', '')
             }
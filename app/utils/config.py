@@ -1,11 +1,18 @@
 import os
 from typing import Dict, Any
 from dotenv import load_dotenv
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
 
 # Load environment variables
 load_dotenv()
 load_dotenv('.env.local', override=True)
 
+def reload_local_env():
+    """Re-read .env.local into the environment after it has been edited."""
+    load_dotenv('.env.local', override=True)
+
 def get_config() -> Dict[str, Any]:
     """Get configuration from environment variables."""
     return {
@@ -13,7 +20,32 @@ def get_config() -> Dict[str, Any]:
         'llm_port': int(os.getenv('LLM_PORT', '1234')),
         'llm_api_flavor': os.getenv('LLM_API_FLAVOR', 'openai-compatible'),
         'llm_default_model': os.getenv('LLM_DEFAULT_MODEL', 'gpt-3.5-turbo'),
+        'llm_pool_size': int(os.getenv('LLM_POOL_SIZE', '10')),
+        'llm_endpoints': os.getenv('LLM_ENDPOINTS', ''),
+        'llm_tool_model': os.getenv('LLM_TOOL_MODEL', ''),
+        'llm_tool_endpoints': os.getenv('LLM_TOOL_ENDPOINTS', ''),
+        'llm_answer_model': os.getenv('LLM_ANSWER_MODEL', ''),
+        'llm_answer_endpoints': os.getenv('LLM_ANSWER_ENDPOINTS', ''),
+        'llm_escalation_enabled': os.getenv('LLM_ESCALATION_ENABLED', 'true').lower() == 'true',
+        'llm_tool_calling': os.getenv('LLM_TOOL_CALLING', 'auto'),
+        'llm_structured_output': os.getenv('LLM_STRUCTURED_OUTPUT', 'false').lower() == 'true',
+        'llm_hedge_enabled': os.getenv('LLM_HEDGE_ENABLED', 'false').lower() == 'true',
+        'llm_cache_mode': os.getenv('LLM_CACHE_MODE', 'off'),
+        'response_mode': os.getenv('RESPONSE_MODE', 'llm'),
+        'tool_prefetch_enabled': os.getenv('TOOL_PREFETCH_ENABLED', 'false').lower() == 'true',
         'mcp_base_url': os.getenv('MCP_BASE_URL', 'http://localhost:8000'),
         'flowhub_hooks_enabled': os.getenv('FLOWHUB_HOOKS_ENABLED', 'false').lower() == 'true',
         'flowhub_webhook_url': os.getenv('FLOWHUB_WEBHOOK_URL', ''),
-    }
\ No newline at end of file
+    }
+
+def parse_tool_seconds(spec: str) -> Dict[str, float]:
+    """Parse per-tool durations from a "name=seconds,name=seconds" string."""
+    values = {}
+    for entry in spec.split(','):
+        name, _, seconds = entry.strip().partition('=')
+        if name and seconds:
+            try:
+                values[name.strip()] = float(seconds)
+            except ValueError:
+                logger.warning(f"Ignoring invalid per-tool setting: {entry}")
+    return values
\ No newline at end of file
@@ -0,0 +1,13 @@
+import hashlib
+import json
+from typing import Any
+
+
+def canonical_json(obj: Any) -> str:
+    """Serialize an object to JSON with a stable key order and no whitespace."""
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def canonical_hash(obj: Any) -> str:
+    """Get a SHA-256 hex digest of the canonical JSON form of an object."""
+    return hashlib.sha256(canonical_json(obj).encode("utf-8")).hexdigest()
@@ -37,9 +37,20 @@ class Translator:
     def get(self, key: str, default: str = "", lang: Optional[str] = None) -> str:
         """Get translated text for a key."""
         language = lang or self.current_language
-        if language in self.translations:
-            return self.translations[language].get(key, default)
-        return default
+        if language not in self.translations:
+            return default
+
+        translations = self.translations[language]
+        if key in translations:
+            return translations[key]
+
+        # Resolve dotted keys like "errors.connection_error" into nested sections
+        value = translations
+        for part in key.split('.'):
+            if not isinstance(value, dict) or part not in value:
+                return default
+            value = value[part]
+        return value
 
     def get_available_languages(self) -> Dict[str, str]:
         """Get available languages with their display names."""
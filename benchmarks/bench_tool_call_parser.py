@@ -0,0 +1,127 @@
+"""Benchmark the incremental tool-call parser against the previous parsing code.
+
+Run from the repository root:
+
+    python benchmarks/bench_tool_call_parser.py
+
+The previous implementation scanned the whole content with str.find and
+rfind and only recognised a single call anchored at the start of the
+message. It is reproduced here (without debug output) as the baseline.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from services.tool_call_parser import ToolCallParser, parse_tool_calls  # noqa: E402
+
+HEADER = "<|start|>assistant<|channel|>commentary to=functions.{name} <|constrain|>json<|message|>"
+
+
+def legacy_parse(content):
+    """The pre-parser implementation of ChatOrchestrator._parse_tool_calls_from_response."""
+    response = {"content": content}
+    content = content.strip()
+    if content.startswith("<|start|>assistant<|channel|>commentary to=functions."):
+        try:
+            start_tool = content.find("functions.") + len("functions.")
+            end_tool = content.find(" <|constrain|>")
+            tool_name = content[start_tool:end_tool]
+            start_json = content.find("<|message|>") + len("<|message|>")
+            json_str = content[start_json:].strip()
+            if json_str.startswith("{") and json_str.endswith("}"):
+                args = json.loads(json_str)
+                response["tool_calls"] = [{
+                    "id": f"call_{hash(content)}",
+                    "type": "function",
+                    "function": {"name": tool_name, "arguments": json.dumps(args)}
+                }]
+                response["content"] = ""
+                return response
+        except (ValueError, json.JSONDecodeError):
+            pass
+
+    try:
+        start = content.find('{')
+        end = content.rfind('}') + 1
+        if start != -1 and end > start:
+            json_str = content[start:end]
+            tool_call = json.loads(json_str)
+            if "tool" in tool_call and "arguments" in tool_call:
+                response["tool_calls"] = [{
+                    "id": f"call_{hash(json_str)}",
+                    "type": "function",
+                    "function": {"name": tool_call["tool"], "arguments": json.dumps(tool_call["arguments"])}
+                }]
+                response["content"] = content[:start] + content[end:]
+    except json.JSONDecodeError:
+        pass
+    return response
+
+
+def legacy_stream(chunks):
+    """Streaming with the legacy parser means re-parsing the accumulated text."""
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        if "tool_calls" in legacy_parse(text):
+            break
+    return legacy_parse(text)
+
+
+def parser_stream(chunks):
+    parser = ToolCallParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.finish()
+    return parser.tool_calls
+
+
+def make_cases(size):
+    prose = ("The quarterly report covers revenue, churn and the regional split. " * (size // 68 + 1))[:size]
+    args = {"query": prose[:size // 2], "limit": 10, "filters": {"region": "EU", "tags": ["a", "b"]}}
+    call = HEADER.format(name="search") + json.dumps(args)
+    return {
+        "prose": prose,
+        "harmony call": call,
+        "json fallback": prose + ' {"tool": "search", "arguments": ' + json.dumps(args) + "} " + prose,
+        "three calls": "<|call|>".join(HEADER.format(name=f"tool_{i}") + json.dumps(args) for i in range(3)),
+    }
+
+
+def timed(func, arg, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(arg)
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def chunked(text, size=8):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def main():
+    print(f"{'case':<16}{'size':>9}{'legacy ms':>12}{'parser ms':>12}{'calls old/new':>15}")
+    for size in (1_000, 10_000, 100_000):
+        for name, content in make_cases(size).items():
+            repeat = max(1, 200_000 // len(content))
+            legacy_ms, legacy = timed(legacy_parse, content, repeat)
+            parser_ms, (_, calls) = timed(parse_tool_calls, content, repeat)
+            found = f"{len(legacy.get('tool_calls', []))}/{len(calls)}"
+            print(f"{name:<16}{len(content):>9}{legacy_ms:>12.3f}{parser_ms:>12.3f}{found:>15}")
+
+    print()
+    print("Streaming in 8-character chunks (legacy re-parses the accumulated text per chunk)")
+    print(f"{'case':<16}{'size':>9}{'legacy ms':>12}{'parser ms':>12}")
+    for size in (1_000, 10_000, 50_000):
+        for name, content in make_cases(size).items():
+            chunks = chunked(content)
+            legacy_ms, _ = timed(legacy_stream, chunks, 1)
+            parser_ms, _ = timed(parser_stream, chunks, 1)
+            print(f"{name:<16}{len(content):>9}{legacy_ms:>12.3f}{parser_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()